@@ -0,0 +1,162 @@
+"""
+Google Maps API Disk Cache
+==========================
+Persists Google Maps (and parsed Gemini) responses under data/.cache/ so
+reruns of the data pipeline scripts skip identical (paid) API calls.
+Kodaikanal geography is static, so entries live for weeks. The directory is
+pruned as it is written: expired entries are deleted and only the newest
+MAX_CACHE_ENTRIES are kept.
+
+Usage:
+    from api_cache import wrap_maps_client
+    gmaps = wrap_maps_client(googlemaps.Client(key=api_key))
+"""
+
+import os
+import json
+import time
+import hashlib
+import functools
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+# Cache location and default time-to-live
+CACHE_DIR = Path(__file__).parent / "data" / ".cache"
+DEFAULT_TTL_DAYS = 30
+
+# Size cap for the cache directory, enforced every PRUNE_EVERY_PUTS writes
+MAX_CACHE_ENTRIES = 20000
+PRUNE_EVERY_PUTS = 200
+
+# googlemaps.Client methods that are safe to cache
+CACHED_METHODS = ('places', 'places_nearby', 'place', 'directions', 'distance_matrix')
+
+
+_puts_since_prune = 0
+_prune_lock = threading.Lock()
+
+
+def _cache_key(name: str, args: tuple, kwargs: dict) -> str:
+    """Stable hash of an API call (endpoint + params)."""
+    payload = json.dumps(
+        {"fn": name, "args": args, "kwargs": kwargs},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cache_get(name: str, args: tuple = (), kwargs: dict = None, ttl_days: float = DEFAULT_TTL_DAYS) -> Any:
+    """Return the cached value for a call, or None if missing/expired/corrupt."""
+    path = CACHE_DIR / f"{_cache_key(name, args, kwargs or {})}.json"
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        if time.time() - entry.get('ts', 0) < ttl_days * 86400:
+            return entry['value']
+    except (OSError, ValueError, KeyError):
+        pass  # Corrupt entry - refetch
+    return None
+
+
+def cache_put(name: str, args: tuple, kwargs: dict, value: Any) -> None:
+    """Store a JSON-serializable value for a call."""
+    path = CACHE_DIR / f"{_cache_key(name, args, kwargs or {})}.json"
+
+    # Write via temp file so concurrent readers never see a partial entry
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.{id(value)}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"ts": time.time(), "value": value}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+    global _puts_since_prune
+    with _prune_lock:
+        due = _puts_since_prune % PRUNE_EVERY_PUTS == 0
+        _puts_since_prune += 1
+    if due:
+        prune_cache()
+
+
+def prune_cache(max_entries: int = MAX_CACHE_ENTRIES, ttl_days: float = DEFAULT_TTL_DAYS) -> int:
+    """
+    Delete expired cache entries, then the oldest ones beyond max_entries.
+
+    Returns:
+        Number of entries removed
+    """
+    entries = []
+    for path in CACHE_DIR.glob("*.json"):
+        try:
+            entries.append((path.stat().st_mtime, path))
+        except OSError:
+            pass  # Removed by another process
+
+    cutoff = time.time() - ttl_days * 86400
+    entries.sort(reverse=True)
+    stale = [path for i, (mtime, path) in enumerate(entries) if mtime < cutoff or i >= max_entries]
+    for path in stale:
+        path.unlink(missing_ok=True)
+    return len(stale)
+
+
+def cached_api(ttl_days: float = DEFAULT_TTL_DAYS, name: str = None) -> Callable:
+    """
+    Decorator that caches a function's JSON-serializable result on disk.
+
+    Args:
+        ttl_days: How long an entry stays valid
+        name: Cache namespace (defaults to the function name)
+    """
+    def decorator(fn: Callable) -> Callable:
+        fn_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs) -> Any:
+            value = cache_get(fn_name, args, kwargs, ttl_days)
+            if value is not None:
+                return value
+
+            value = fn(*args, **kwargs)
+            cache_put(fn_name, args, kwargs, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def _cached_maps_method(fn: Callable, name: str, ttl_days: float) -> Callable:
+    """
+    Disk-cache one googlemaps.Client method.
+
+    Page tokens expire within minutes, so page-token calls always go to the
+    API, and a first page that carries a next_page_token is not stored
+    (a cached one would hand out a dead token).
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs) -> Any:
+        if kwargs.get('page_token'):
+            return fn(*args, **kwargs)
+
+        value = cache_get(name, args, kwargs, ttl_days)
+        if value is not None:
+            return value
+
+        value = fn(*args, **kwargs)
+        if not (isinstance(value, dict) and value.get('next_page_token')):
+            cache_put(name, args, kwargs, value)
+        return value
+
+    return wrapper
+
+
+def wrap_maps_client(gmaps, ttl_days: float = DEFAULT_TTL_DAYS):
+    """Route a googlemaps.Client's lookup methods through the disk cache."""
+    for method in CACHED_METHODS:
+        original = getattr(gmaps, method)
+        setattr(gmaps, method, _cached_maps_method(original, f"gmaps.{method}", ttl_days))
+    return gmaps
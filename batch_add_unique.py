@@ -5,8 +5,7 @@ Batch Fetch Additional Unique Places
 Running pipeline for specific category additions.
 """
 
-import time
-from fetch_place_data import fetch_place_data, load_master_json
+from fetch_place_data import fetch_places_concurrently, PlacesIndex
 
 PLACES_TO_ADD = [
     "Poombarai View Point",
@@ -26,21 +25,21 @@ def batch_add_unique():
     print("ADDING UNIQUE CATEGORY PLACES")
     print("=" * 70)
     
-    master = load_master_json()
-    existing_names = {p["name"].lower() for p in master.get("places", [])}
+    index = PlacesIndex.from_master()
     
+    to_fetch = []
     for place_name in PLACES_TO_ADD:
-        if place_name.lower() in existing_names:
+        if index.contains(place_name):
             print(f"Skipping {place_name} (Already exists)")
             continue
-            
-        print(f"\nProcessing: {place_name}")
-        try:
-            fetch_place_data(place_name)
+        to_fetch.append(place_name)
+    
+    print(f"\nProcessing {len(to_fetch)} places...")
+    for place_name, result in fetch_places_concurrently(to_fetch):
+        if isinstance(result, Exception):
+            print(f"❌ Failed {place_name}: {result}")
+        else:
             print(f"✅ Added {place_name}")
-            time.sleep(2)
-        except Exception as e:
-            print(f"❌ Failed {place_name}: {e}")
 
 if __name__ == "__main__":
     batch_add_unique()
@@ -2,12 +2,11 @@
 """
 Batch Fetch Places for Kodaikanal
 ==================================
-Runs the pipeline for multiple places sequentially.
+Runs the pipeline for multiple places concurrently.
 """
 
-import time
 import sys
-from fetch_place_data import fetch_place_data, load_master_json
+from fetch_place_data import fetch_places_concurrently, PlacesIndex, MAX_CONCURRENT_FETCHES
 
 # Places to fetch (excluding already fetched and removed ones)
 PLACES_TO_FETCH = [
@@ -51,31 +50,31 @@ def batch_fetch():
     print("=" * 70)
     
     # Check what's already in DB
-    master = load_master_json()
-    existing_names = {p["name"].lower() for p in master.get("places", [])}
+    index = PlacesIndex.from_master()
     
     success_count = 0
     failed = []
     
-    for i, place_name in enumerate(PLACES_TO_FETCH, 1):
-        print(f"\n[{i}/{len(PLACES_TO_FETCH)}] Processing: {place_name}")
-        
-        # Skip if already exists
-        if place_name.lower() in existing_names:
-            print(f"   ⏭️ Already in database, skipping...")
-            continue
-        
-        try:
-            result = fetch_place_data(place_name)
-            print(f"   ✅ Success: {result['name']} (Rank #{result['stats']['popularity_rank']})")
+    # Skip places that already exist
+    to_fetch = []
+    for place_name in PLACES_TO_FETCH:
+        if index.contains(place_name):
+            print(f"   ⏭️ Already in database, skipping: {place_name}")
+        else:
+            to_fetch.append(place_name)
+    
+    print(f"\n🚀 Fetching {len(to_fetch)} places ({MAX_CONCURRENT_FETCHES} at a time)...")
+    
+    results = fetch_places_concurrently(to_fetch)
+    
+    for i, (place_name, result) in enumerate(results, 1):
+        if isinstance(result, Exception):
+            print(f"\n[{i}/{len(to_fetch)}] ❌ Failed: {place_name}: {result}")
+            failed.append((place_name, str(result)))
+        else:
+            print(f"\n[{i}/{len(to_fetch)}] ✅ Success: {result['name']} (Rank #{result['stats']['popularity_rank']})")
             success_count += 1
-            
-            # Small delay to avoid rate limiting
-            time.sleep(2)
-            
-        except Exception as e:
-            print(f"   ❌ Failed: {e}")
-            failed.append((place_name, str(e)))
+            index.add(result)
     
     print("\n" + "=" * 70)
     print("BATCH COMPLETE")
@@ -88,9 +87,8 @@ def batch_fetch():
         for name, error in failed:
             print(f"  - {name}: {error}")
     
-    # Show final count
-    master = load_master_json()
-    print(f"\n📊 Total places in database: {master['total_count']}")
+    # Show final count (index was kept current, no need to reload the master file)
+    print(f"\n📊 Total places in database: {len(index)}")
     print("=" * 70)
 
 if __name__ == "__main__":
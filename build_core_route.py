@@ -4,7 +4,7 @@ Core 25 Circular Route Generator
 =================================
 Creates a unified "Golden Loop" starting and ending at Kodaikanal Bus Stand.
 Filters for top 25 most popular places in core zones and optimizes their order
-using Google Maps Directions API.
+locally (Christofides + 2-opt) over a Google Maps Distance Matrix of drive times.
 
 Exclusions:
 - Places in "Outskirts", "Village & Meadows", or "Poombarai" clusters
@@ -15,10 +15,17 @@ Usage:
 """
 
 import os
-import json
+import re
+import heapq
+from dataclasses import dataclass
+from operator import attrgetter
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
-import googlemaps
+import numpy as np
+
+from fetch_place_data import get_maps_client
+from json_io import load_json_file, dump_json_file
+from route_solver import optimize_tour, distance_matrix_batched
 
 load_dotenv()
 
@@ -28,74 +35,101 @@ OUTPUT_PATH = 'data/core_route.json'
 GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY')
 
 # Clusters to exclude
-EXCLUDED_CLUSTERS = {'Outskirts', 'Village & Meadows', 'Poombarai'}
+EXCLUDED_CLUSTERS = frozenset({'Outskirts', 'Village & Meadows', 'Poombarai'})
 
 # Specific places to exclude (partial match)
-EXCLUDED_NAMES = ['Jeep Safari']
+EXCLUDED_NAMES = ('Jeep Safari',)
+
+# All excluded names as one precompiled alternation (single scan per place)
+EXCLUDED_NAME_PATTERN = re.compile('|'.join(map(re.escape, EXCLUDED_NAMES))) if EXCLUDED_NAMES else None
 
 # Bus Stand name for anchor
 BUS_STAND_NAME = 'Kodaikanal Bus Stand'
 BUS_STAND_ID = 'kodaikanal-bus-stand-kodaikanal'
 
-# Maximum waypoints for Google Maps (excluding origin/destination)
+# Number of places in the Golden Loop
 MAX_WAYPOINTS = 25
 
 
-def load_places() -> List[Dict]:
+@dataclass(slots=True, frozen=True)
+class Place:
+    """The fields of a master-JSON place that route building needs, parsed once."""
+    id: str
+    name: str
+    google_place_id: str
+    lat: float
+    lng: float
+    cluster: str
+    popularity_score: float
+    popularity_rank: int
+    rating: float
+    
+    @classmethod
+    def from_dict(cls, place: Dict) -> 'Place':
+        location = place.get('location', {})
+        stats = place.get('stats', {})
+        return cls(
+            id=place.get('id', ''),
+            name=place.get('name', ''),
+            google_place_id=place.get('google_place_id', ''),
+            lat=location.get('lat'),
+            lng=location.get('lng'),
+            cluster=location.get('cluster_zone', ''),
+            popularity_score=stats.get('popularity_score', 0),
+            popularity_rank=stats.get('popularity_rank', 0),
+            rating=stats.get('rating', 0)
+        )
+
+
+def load_places() -> List[Place]:
     """Load places from JSON file."""
-    with open(PLACES_PATH, 'r') as f:
-        data = json.load(f)
-    return data.get('places', [])
+    data = load_json_file(PLACES_PATH)
+    return [Place.from_dict(p) for p in data.get('places', [])]
 
 
-def filter_core_places(places: List[Dict]) -> List[Dict]:
+def _keep_core_place(place: Place) -> bool:
+    """True if a place is in a core cluster and not an excluded experience."""
+    # Skip excluded clusters
+    if place.cluster in EXCLUDED_CLUSTERS:
+        return False
+    
+    # Skip excluded names (partial match)
+    name = place.name
+    if EXCLUDED_NAME_PATTERN and EXCLUDED_NAME_PATTERN.search(name):
+        print(f"  ⏭️ Excluding: {name} (experience, not location)")
+        return False
+    
+    return True
+
+
+def filter_core_places(places: List[Place]) -> List[Place]:
     """
     Filter places to core zones only.
     Excludes Outskirts, Village & Meadows, Poombarai, and Jeep Safari.
     """
-    filtered = []
-    
-    for place in places:
-        cluster = place.get('location', {}).get('cluster_zone', '')
-        name = place.get('name', '')
-        
-        # Skip excluded clusters
-        if cluster in EXCLUDED_CLUSTERS:
-            continue
-        
-        # Skip excluded names (partial match)
-        if any(excluded in name for excluded in EXCLUDED_NAMES):
-            print(f"  ⏭️ Excluding: {name} (experience, not location)")
-            continue
-        
-        filtered.append(place)
-    
-    return filtered
+    return [place for place in places if _keep_core_place(place)]
 
 
-def find_bus_stand(places: List[Dict]) -> Optional[Dict]:
-    """Find the bus stand place by name or ID."""
-    for place in places:
-        if place.get('id') == BUS_STAND_ID or BUS_STAND_NAME.lower() in place.get('name', '').lower():
-            return place
-    return None
+def find_bus_stand(places_by_id: Dict[str, Place]) -> Optional[Place]:
+    """Find the bus stand place by ID (O(1)), falling back to a name scan."""
+    bus_stand = places_by_id.get(BUS_STAND_ID)
+    if bus_stand:
+        return bus_stand
+    
+    bus_stand_name = BUS_STAND_NAME.lower()
+    return next((p for p in places_by_id.values() if bus_stand_name in p.name.lower()), None)
 
 
-def select_top_places(places: List[Dict], bus_stand: Dict, limit: int = 25) -> List[Dict]:
+def select_top_places(places: List[Place], bus_stand: Place, limit: int = 25) -> List[Place]:
     """
     Select top N places by popularity score.
     Ensures bus stand is in the list.
     """
-    # Sort by popularity score (descending)
-    sorted_places = sorted(
-        places,
-        key=lambda p: p.get('stats', {}).get('popularity_score', 0),
-        reverse=True
-    )
+    # Top N by popularity score (descending)
+    top_n = heapq.nlargest(limit, places, key=attrgetter('popularity_score'))
     
     # Check if bus stand is in top N
-    top_n = sorted_places[:limit]
-    bus_stand_in_top = any(p['id'] == bus_stand['id'] for p in top_n)
+    bus_stand_in_top = any(p.id == bus_stand.id for p in top_n)
     
     if not bus_stand_in_top:
         # Add bus stand and remove last place
@@ -104,9 +138,21 @@ def select_top_places(places: List[Dict], bus_stand: Dict, limit: int = 25) -> L
     return top_n
 
 
-def build_core_route(places: List[Dict], bus_stand: Dict, gmaps_client) -> List[Dict]:
+def format_duration(seconds: float) -> str:
+    """Format seconds the way Google Maps does ("1 min", "12 mins", "1 hour 5 mins")."""
+    minutes = round(seconds / 60)
+    hours, mins = divmod(minutes, 60)
+    parts = []
+    if hours:
+        parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
+    if mins or not hours:
+        parts.append(f"{mins} min{'s' if mins != 1 else ''}")
+    return ' '.join(parts)
+
+
+def build_core_route(places: List[Place], bus_stand: Place, gmaps_client) -> List[Dict]:
     """
-    Build optimized circular route using Google Maps Directions API.
+    Build optimized circular route from a Distance Matrix + local tour solver.
     
     Args:
         places: List of places (should include bus stand)
@@ -117,101 +163,44 @@ def build_core_route(places: List[Dict], bus_stand: Dict, gmaps_client) -> List[
         Ordered list of places with travel times
     """
     print(f"\n🔄 Building Core Route ({len(places)} places)")
-    print(f"  🚌 Anchor: {bus_stand['name']}")
-    
-    # Build waypoints (all places except bus stand)
-    waypoints = []
-    waypoint_places = []
+    print(f"  🚌 Anchor: {bus_stand.name}")
     
-    for place in places:
-        if place['id'] != bus_stand['id']:
-            waypoints.append(f"place_id:{place['google_place_id']}")
-            waypoint_places.append(place)
-    
-    if len(waypoints) > 25:
-        print(f"  ⚠️ Too many waypoints ({len(waypoints)}), limiting to 25")
-        waypoints = waypoints[:25]
-        waypoint_places = waypoint_places[:25]
-    
-    print(f"  📍 Waypoints: {len(waypoints)}")
+    # Anchor first, then every other place
+    stops = [bus_stand] + [p for p in places if p.id != bus_stand.id]
+    print(f"  📍 Waypoints: {len(stops) - 1}")
     
     try:
-        # Call Google Maps Directions API
-        origin = f"place_id:{bus_stand['google_place_id']}"
-        destination = origin  # Circular route
-        
-        print(f"  📡 Calling Directions API...")
-        
-        directions_result = gmaps_client.directions(
-            origin=origin,
-            destination=destination,
-            waypoints=waypoints,
-            optimize_waypoints=True,
-            mode='driving'
+        print(f"  📡 Calling Distance Matrix API...")
+        matrix = distance_matrix_batched(
+            gmaps_client,
+            [f"place_id:{p.google_place_id}" for p in stops]
         )
         
-        if not directions_result:
-            print(f"  ❌ No route found")
-            return []
-        
-        route = directions_result[0]
-        waypoint_order = route.get('waypoint_order', [])
-        legs = route.get('legs', [])
-        
-        print(f"  ✅ Optimized order received: {len(waypoint_order)} waypoints")
+        tour = optimize_tour(matrix, start_idx=0)
+        print(f"  ✅ Optimized order computed locally: {len(tour) - 1} waypoints")
         
         # Build result list
         result = []
-        
-        # First: Bus Stand (anchor/origin)
-        first_leg_duration = legs[0]['duration']['value'] if legs else 0
-        first_leg_text = legs[0]['duration']['text'] if legs else "0 min"
-        
-        result.append({
-            'sequence': 0,
-            'name': bus_stand['name'],
-            'id': bus_stand['id'],
-            'place_id': bus_stand['google_place_id'],
-            'cluster': bus_stand.get('location', {}).get('cluster_zone', ''),
-            'type': 'anchor',
-            'next_stop_minutes': round(first_leg_duration / 60),
-            'next_stop_text': first_leg_text,
-            'popularity_rank': bus_stand.get('stats', {}).get('popularity_rank', 0),
-            'rating': bus_stand.get('stats', {}).get('rating', 0)
-        })
-        
-        # Middle: Waypoints in optimized order
-        for i, wp_idx in enumerate(waypoint_order):
-            place = waypoint_places[wp_idx]
-            
-            # Get travel time to next from corresponding leg
-            leg_idx = i + 1
-            travel_time = 0
-            travel_text = "0 min"
-            if leg_idx < len(legs):
-                travel_time = legs[leg_idx]['duration']['value']
-                travel_text = legs[leg_idx]['duration']['text']
+        for sequence, idx in enumerate(tour):
+            place = stops[idx]
+            next_idx = tour[(sequence + 1) % len(tour)]
+            travel_time = matrix[idx, next_idx]
+            if not np.isfinite(travel_time):
+                travel_time = 0
             
             result.append({
-                'sequence': i + 1,
-                'name': place['name'],
-                'id': place['id'],
-                'place_id': place['google_place_id'],
-                'cluster': place.get('location', {}).get('cluster_zone', ''),
-                'type': 'waypoint',
+                'sequence': sequence,
+                'name': place.name,
+                'id': place.id,
+                'place_id': place.google_place_id,
+                'cluster': place.cluster,
+                'type': 'anchor' if sequence == 0 else 'waypoint',
                 'next_stop_minutes': round(travel_time / 60),
-                'next_stop_text': travel_text,
-                'popularity_rank': place.get('stats', {}).get('popularity_rank', 0),
-                'rating': place.get('stats', {}).get('rating', 0)
+                'next_stop_text': format_duration(travel_time),
+                'popularity_rank': place.popularity_rank,
+                'rating': place.rating
             })
         
-        # Add return leg info (last waypoint back to bus stand)
-        if legs:
-            last_leg = legs[-1]
-            return_time = last_leg['duration']['value']
-            result[-1]['next_stop_minutes'] = round(return_time / 60)
-            result[-1]['next_stop_text'] = last_leg['duration']['text']
-        
         return result
         
     except Exception as e:
@@ -233,8 +222,8 @@ def main():
         return
     
     # Initialize Google Maps client
-    gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
-    print(f"✅ Google Maps client initialized")
+    gmaps = get_maps_client(cached=True)
+    print(f"✅ Google Maps client initialized (disk-cached)")
     
     # Load places
     all_places = load_places()
@@ -247,11 +236,11 @@ def main():
     print(f"  Core zones only: {len(core_places)} places")
     
     # Find bus stand
-    bus_stand = find_bus_stand(all_places)
+    bus_stand = find_bus_stand({p.id: p for p in all_places})
     if not bus_stand:
         print("❌ Could not find Kodaikanal Bus Stand in data")
         return
-    print(f"  🚌 Found anchor: {bus_stand['name']}")
+    print(f"  🚌 Found anchor: {bus_stand.name}")
     
     # Select top 25
     print("\n🏆 SELECTING TOP 25")
@@ -260,9 +249,7 @@ def main():
     print(f"  Selected: {len(top_places)} places")
     
     for i, p in enumerate(top_places[:10], 1):
-        rank = p.get('stats', {}).get('popularity_rank', '?')
-        score = p.get('stats', {}).get('popularity_score', 0)
-        print(f"    {i:2}. {p['name'][:30]:<30} (Rank {rank}, Score {score:.1f})")
+        print(f"    {i:2}. {p.name[:30]:<30} (Rank {p.popularity_rank}, Score {p.popularity_score:.1f})")
     if len(top_places) > 10:
         print(f"    ... and {len(top_places) - 10} more")
     
@@ -280,8 +267,7 @@ def main():
     print("-"*40)
     
     os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-    with open(OUTPUT_PATH, 'w') as f:
-        json.dump(route, f, indent=2)
+    dump_json_file(OUTPUT_PATH, route)
     
     print(f"✅ Saved to {OUTPUT_PATH}")
     
@@ -297,7 +283,7 @@ def main():
         next_time = stop['next_stop_minutes']
         marker = "🚌" if stop['type'] == 'anchor' else "📍"
         print(f"  {marker} {stop['sequence']:2}. {stop['name'][:35]:<35} → {next_time} min")
-    print(f"  🚌  ↩ Return to {bus_stand['name']}")
+    print(f"  🚌  ↩ Return to {bus_stand.name}")
     
     print("\n✅ Pipeline complete!")
 
@@ -1,23 +1,29 @@
 import time
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
 
-print("Starting latency check...")
-start = time.time()
-
-try:
-    from scorer import ItineraryRanker
-    print(f"Import took {time.time()-start:.2f}s")
+def main():
+    # Imported here so nothing runs on import; kept out of the timed section
+    from dotenv import load_dotenv
+    load_dotenv()
     
-    t0 = time.time()
-    ranker = ItineraryRanker()
-    print(f"Model Instantiation took {time.time()-t0:.2f}s")
+    print("Starting latency check...")
     
-    t1 = time.time()
-    res = ranker.score_places({'interests': ['nature'], 'difficulty': 'medium'})
-    print(f"Scoring took {time.time()-t1:.2f}s")
-    print(f"Total time: {time.time()-start:.2f}s")
-except Exception as e:
-    print(f"Error: {e}")
+    try:
+        start = time.time()
+        from scorer import ItineraryRanker
+        print(f"Import took {time.time()-start:.2f}s")
+        
+        t0 = time.time()
+        ranker = ItineraryRanker()
+        print(f"Model Instantiation took {time.time()-t0:.2f}s")
+        
+        t1 = time.time()
+        res = ranker.score_places({'interests': ['nature'], 'difficulty': 'medium'})
+        print(f"Scoring took {time.time()-t1:.2f}s")
+        print(f"Total time: {time.time()-start:.2f}s")
+    except Exception as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,17 +6,24 @@ Fetches popular tourist spots from Google Maps API and ranks them by review coun
 """
 
 import os
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import googlemaps
 
-load_dotenv()
+import numpy as np
 
-# Kodaikanal center coordinates
-KODAIKANAL_CENTER = (10.232, 77.489)
+from api_cache import cache_get, cache_put
+from json_io import dump_json_file
+from fetch_place_data import (
+    get_maps_client,
+    haversine_matrix,
+    KODAIKANAL_CENTER,
+    KODAIKANAL_LAT,
+    KODAIKANAL_LNG,
+    MAX_DISTANCE_FROM_CENTER_KM,
+)
 
-# Search radius in meters (50km = 50000m)
-SEARCH_RADIUS = 50000
+load_dotenv()
 
 # Place types to search for tourist attractions
 PLACE_TYPES = [
@@ -26,14 +33,107 @@ PLACE_TYPES = [
     "natural_feature",
 ]
 
+# Text Search radius around KODAIKANAL_CENTER, in meters
+SEARCH_RADIUS = 50000
+
+# Disk-cache namespace for a keyword's complete (all pages) results
+SEARCH_CACHE_NAMESPACE = "discover.search_keyword"
+
+# Search keywords (different angles to get variety)
+SEARCH_KEYWORDS = (
+    "museum in Kodaikanal",
+    "adventure sports Kodaikanal",
+    "trekking Kodaikanal",
+    "boating Kodaikanal",
+    "shopping Kodaikanal",
+    "hidden gems Kodaikanal",
+    "nature park Kodaikanal",
+    "waterfall Kodaikanal",
+)
+
+
+def search_keyword(gmaps, keyword: str) -> list:
+    """
+    Run one Text Search and follow all of its pagination.
+    
+    Relevance-ranked Text Search (not distance-ranked Nearby Search) keeps
+    popular places far from the center, and each keyword pages on its own,
+    so results do not depend on how the keyword workers interleave.
+    Complete result sets are cached on disk per keyword, since page tokens
+    expire and single pages can't be replayed. Returns raw results from all
+    fetched pages.
+    """
+    print(f"\n🔍 Searching: {keyword}")
+    cached = cache_get(SEARCH_CACHE_NAMESPACE, (keyword, SEARCH_RADIUS))
+    if cached is not None:
+        print(f"   Found {len(cached)} places for: {keyword} (cached)")
+        return cached
+    
+    places = []
+    
+    try:
+        # Text search for the keyword
+        results = gmaps.places(
+            query=keyword,
+            location=KODAIKANAL_CENTER,
+            radius=SEARCH_RADIUS
+        )
+        places.extend(results.get("results", []))
+        
+        # Handle pagination if available
+        while results.get("next_page_token"):
+            time.sleep(2)  # Required delay for next_page_token
+            results = gmaps.places(
+                query=keyword,
+                page_token=results["next_page_token"]
+            )
+            places.extend(results.get("results", []))
+        
+        print(f"   Found {len(places)} places for: {keyword}")
+        cache_put(SEARCH_CACHE_NAMESPACE, (keyword, SEARCH_RADIUS), None, places)
+        
+    except Exception as e:
+        print(f"   Error ({keyword}): {e}")
+    
+    # Keep whatever pages were fetched before any error
+    return places
+
+
+def _merge_page(page: list, all_places: dict) -> None:
+    """Add raw search results to all_places (keyed by place_id, first sighting wins)."""
+    for place in page:
+        place_id = place.get("place_id")
+        if place_id and place_id not in all_places:
+            location = place.get("geometry", {}).get("location", {})
+            all_places[place_id] = {
+                "name": place.get("name"),
+                "place_id": place_id,
+                "rating": place.get("rating"),
+                "user_ratings_total": place.get("user_ratings_total", 0),
+                "types": place.get("types", []),
+                "address": place.get("formatted_address", place.get("vicinity", "")),
+                "lat": location.get("lat"),
+                "lng": location.get("lng"),
+            }
+
+
+def _within_range(places: list) -> list:
+    """Drop places farther than MAX_DISTANCE_FROM_CENTER_KM (one vectorized pass)."""
+    if not places:
+        return places
+    lats = np.array([p["lat"] if p["lat"] is not None else np.nan for p in places], dtype=float)
+    lngs = np.array([p["lng"] if p["lng"] is not None else np.nan for p in places], dtype=float)
+    distances = haversine_matrix([KODAIKANAL_LAT], [KODAIKANAL_LNG], lats, lngs)[0]
+    # Places without coordinates (NaN distance) are kept
+    keep = ~(distances > MAX_DISTANCE_FROM_CENTER_KM)
+    return [p for p, ok in zip(places, keep) if ok]
+
+
 def discover_places():
     """Find top places around Kodaikanal sorted by review count."""
     
-    api_key = os.getenv("GOOGLE_MAPS_API_KEY")
-    if not api_key:
-        raise ValueError("GOOGLE_MAPS_API_KEY not set")
-    
-    gmaps = googlemaps.Client(key=api_key)
+    # Shared (disk-cached, connection-pooled) client; raises if the key is unset
+    gmaps = get_maps_client(cached=True)
     
     all_places = {}
     
@@ -44,74 +144,24 @@ def discover_places():
     print(f"Search radius: {SEARCH_RADIUS/1000} km")
     print("=" * 70)
     
-    # Search with different keywords to get variety
-    keywords = [
-        "museum in Kodaikanal",
-        "adventure sports Kodaikanal",
-        "trekking Kodaikanal",
-        "boating Kodaikanal",
-        "shopping Kodaikanal",
-        "hidden gems Kodaikanal",
-        "nature park Kodaikanal",
-        "waterfall Kodaikanal",
-    ]
-    
-    for keyword in keywords:
-        print(f"\n🔍 Searching: {keyword}")
-        
-        try:
-            # Text search for the keyword
-            results = gmaps.places(
-                query=keyword,
-                location=KODAIKANAL_CENTER,
-                radius=SEARCH_RADIUS
-            )
-            
-            places = results.get("results", [])
-            print(f"   Found {len(places)} places")
-            
-            for place in places:
-                place_id = place.get("place_id")
-                if place_id and place_id not in all_places:
-                    all_places[place_id] = {
-                        "name": place.get("name"),
-                        "place_id": place_id,
-                        "rating": place.get("rating"),
-                        "user_ratings_total": place.get("user_ratings_total", 0),
-                        "types": place.get("types", []),
-                        "address": place.get("formatted_address", place.get("vicinity", "")),
-                        "lat": place.get("geometry", {}).get("location", {}).get("lat"),
-                        "lng": place.get("geometry", {}).get("location", {}).get("lng"),
-                    }
-            
-            # Handle pagination if available
-            while results.get("next_page_token"):
-                import time
-                time.sleep(2)  # Required delay for next_page_token
-                results = gmaps.places(
-                    query=keyword,
-                    page_token=results["next_page_token"]
-                )
-                for place in results.get("results", []):
-                    place_id = place.get("place_id")
-                    if place_id and place_id not in all_places:
-                        all_places[place_id] = {
-                            "name": place.get("name"),
-                            "place_id": place_id,
-                            "rating": place.get("rating"),
-                            "user_ratings_total": place.get("user_ratings_total", 0),
-                            "types": place.get("types", []),
-                            "address": place.get("formatted_address", place.get("vicinity", "")),
-                            "lat": place.get("geometry", {}).get("location", {}).get("lat"),
-                            "lng": place.get("geometry", {}).get("location", {}).get("lng"),
-                        }
-                        
-        except Exception as e:
-            print(f"   Error: {e}")
+    # One worker per keyword: each mostly waits out its 2s page-token delays
+    with ThreadPoolExecutor(max_workers=len(SEARCH_KEYWORDS)) as executor:
+        keyword_results = list(executor.map(
+            lambda kw: search_keyword(gmaps, kw),
+            SEARCH_KEYWORDS
+        ))
+    
+    # Merge in keyword order (first sighting wins)
+    for places in keyword_results:
+        _merge_page(places, all_places)
+    
+    in_range = _within_range(list(all_places.values()))
+    if len(in_range) < len(all_places):
+        print(f"\n📏 Dropped {len(all_places) - len(in_range)} places beyond {MAX_DISTANCE_FROM_CENTER_KM} km")
     
     # Sort by review count (descending)
     sorted_places = sorted(
-        all_places.values(),
+        in_range,
         key=lambda x: x.get("user_ratings_total", 0),
         reverse=True
     )
@@ -139,12 +189,11 @@ def discover_places():
     output_file = "data/discovered_places.json"
     os.makedirs("data", exist_ok=True)
     
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump({
-            "total_found": len(all_places),
-            "top_30": top_places,
-            "all_places": sorted_places
-        }, f, indent=2, ensure_ascii=False)
+    dump_json_file(output_file, {
+        "total_found": len(all_places),
+        "top_30": top_places,
+        "all_places": sorted_places
+    })
     
     print(f"\n📁 Full results saved to: {output_file}")
     
@@ -13,21 +13,40 @@ Usage:
     python fetch_place_data.py "Kodaikanal Lake" --aggregate
 """
 
+from __future__ import annotations
+
 import os
 import sys
 import json
+import heapq
+import functools
 import logging
+import random
 import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Any
+from typing import TYPE_CHECKING, Callable, Optional, Any, List, Tuple
 
-import googlemaps
-from google import genai
-from google.genai import types
+import numpy as np
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
 from slugify import slugify
 from dotenv import load_dotenv
 
+from api_cache import wrap_maps_client, cache_get, cache_put
+from json_io import load_json_file, dump_json_file, EMPTY_SECTION
+from route_solver import DISTANCE_MATRIX_MAX_ELEMENTS
+
+# googlemaps and google.genai take ~0.5s to import; they are loaded on first
+# API use so CLI paths that only read the master JSON start instantly.
+if TYPE_CHECKING:
+    import googlemaps
+    from google import genai
+
 # Load environment variables
 load_dotenv()
 
@@ -47,6 +66,7 @@ logger = logging.getLogger(__name__)
 
 # Kodaikanal center coordinates (Kodaikanal Lake)
 KODAIKANAL_CENTER = (10.232, 77.489)
+KODAIKANAL_LAT, KODAIKANAL_LNG = KODAIKANAL_CENTER
 
 # Maximum distance from Kodaikanal center (km) - places beyond this get a warning
 MAX_DISTANCE_FROM_CENTER_KM = 50.0
@@ -59,9 +79,18 @@ CLUSTER_CENTERS = {
     "Poombarai": (10.252, 77.408),        # Village View
 }
 
+# Cluster names and Distance Matrix destination strings, in CLUSTER_CENTERS order
+CLUSTER_NAMES = tuple(CLUSTER_CENTERS.keys())
+CLUSTER_DEST_STRINGS = tuple(f"{lat},{lng}" for lat, lng in CLUSTER_CENTERS.values())
+
 # Distance threshold for cluster assignment (km)
 CLUSTER_DISTANCE_THRESHOLD_KM = 5.0
 
+# Straight-line radius inside which a place is assigned to an unambiguous
+# nearest cluster without a Distance Matrix call. Kept well under the driving
+# threshold: hill roads can turn a short hop into a long drive.
+CLUSTER_FAST_PATH_KM = 1.0
+
 # Popularity score normalization factor
 POPULARITY_NORMALIZATION = 20000
 
@@ -71,16 +100,83 @@ DATA_DIR = Path(__file__).parent / "data"
 # Images directory
 IMAGES_DIR = DATA_DIR / "images"
 
+# Place Details field masks: Basic-tier fields first, premium only for in-range places
+BASIC_FIELDS = ["name", "geometry", "place_id"]
+PREMIUM_FIELDS = [
+    "rating",
+    "user_ratings_total",
+    "price_level",
+    "website",
+    "opening_hours",
+    "photo",
+    "url",
+    "formatted_address"
+]
+
+# Retry policy for transient API failures (rate limits, 5xx, network)
+MAX_API_RETRIES = 4
+RETRY_BASE_DELAY_SECONDS = 1.0
+RETRY_MAX_DELAY_SECONDS = 30.0
+
+# Max places fetched in parallel by batch runs (keeps us under Places API QPS)
+MAX_CONCURRENT_FETCHES = 8
+
+# Markdown code fence Gemini sometimes wraps its JSON answer in
+_FENCE_RE = re.compile(r'```(?:json)?\s*([\s\S]*?)\s*```')
+
+# Fields build_place_data reads from a Gemini answer, with their defaults
+GEMINI_FIELD_DEFAULTS = {
+    "avg_time_spent_minutes": 60,
+    "peak_hours": [],
+    "tags": [],
+    "best_time_text": "",
+    "difficulty": "Easy",
+    "short_summary": "",
+    "tips": [],
+    "hero_image_url": None,
+    "source_links": [],
+    "itinerary_include": True,
+}
+
+# Places ingested more recently than this are reused as-is (force=True / --force refetches)
+REINGEST_TTL_DAYS = 30
+
+# Disk-cache namespace for parsed Gemini answers (see api_cache)
+GEMINI_CACHE_NAMESPACE = "gemini.soft_data"
+
+# Parallel photo downloads (one keep-alive connection each)
+IMAGE_DOWNLOAD_WORKERS = 16
+
+# How long a batch flush waits for a still-running photo download
+IMAGE_DOWNLOAD_TIMEOUT_SECONDS = 30
+
+# Runs the stages that only need Stage 1 output (Gemini, image download)
+# alongside Stage 3 within one place's pipeline. They hit separate quotas,
+# so overlapping them is free.
+_STAGE_EXECUTOR = ThreadPoolExecutor(max_workers=2 * MAX_CONCURRENT_FETCHES, thread_name_prefix="stage")
+
+# Serializes read-modify-write of the master JSON across worker threads
+# (reentrant: save_to_master_json holds it around a MasterStore load + flush)
+_MASTER_LOCK = threading.RLock()
+
 # =============================================================================
 # DISTANCE HELPERS
 # =============================================================================
 
 import math
 
+EARTH_RADIUS_KM = 6371
+
+# Cluster center coordinates as a (4, 2) array, in CLUSTER_CENTERS order
+CLUSTER_CENTER_COORDS = np.array(list(CLUSTER_CENTERS.values()), dtype=float)
+
+
 def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """
     Calculate the great-circle distance between two points on Earth.
     
+    Scalar path for single-point callers; use haversine_matrix for batches.
+    
     Args:
         lat1, lng1: First point coordinates
         lat2, lng2: Second point coordinates
@@ -88,8 +184,6 @@ def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> fl
     Returns:
         Distance in kilometers
     """
-    R = 6371  # Earth's radius in km
-    
     lat1_rad = math.radians(lat1)
     lat2_rad = math.radians(lat2)
     delta_lat = math.radians(lat2 - lat1)
@@ -98,7 +192,39 @@ def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> fl
     a = math.sin(delta_lat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lng/2)**2
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
     
-    return R * c
+    return EARTH_RADIUS_KM * c
+
+
+def haversine_matrix(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """
+    Pairwise great-circle distances between two sets of points.
+    
+    Args:
+        lat1, lng1: Arrays of N origin coordinates
+        lat2, lng2: Arrays of M destination coordinates
+    
+    Returns:
+        (N, M) array of distances in kilometers
+    """
+    lat1 = np.radians(np.asarray(lat1, dtype=float))[:, None]
+    lng1 = np.radians(np.asarray(lng1, dtype=float))[:, None]
+    lat2 = np.radians(np.asarray(lat2, dtype=float))[None, :]
+    lng2 = np.radians(np.asarray(lng2, dtype=float))[None, :]
+    
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    
+    return EARTH_RADIUS_KM * c
+
+
+def cluster_center_distances(lats, lngs) -> np.ndarray:
+    """
+    Straight-line distance from each place to every cluster center.
+    
+    Returns:
+        (N, len(CLUSTER_CENTERS)) array in km, columns in CLUSTER_CENTERS order
+    """
+    return haversine_matrix(lats, lngs, CLUSTER_CENTER_COORDS[:, 0], CLUSTER_CENTER_COORDS[:, 1])
 
 
 def check_distance_from_kodaikanal(lat: float, lng: float) -> dict:
@@ -111,10 +237,7 @@ def check_distance_from_kodaikanal(lat: float, lng: float) -> dict:
     Returns:
         Dictionary with distance info and warning if applicable
     """
-    distance = haversine_distance(
-        KODAIKANAL_CENTER[0], KODAIKANAL_CENTER[1],
-        lat, lng
-    )
+    distance = haversine_distance(KODAIKANAL_LAT, KODAIKANAL_LNG, lat, lng)
     
     result = {
         "distance_from_center_km": round(distance, 2),
@@ -132,19 +255,74 @@ def check_distance_from_kodaikanal(lat: float, lng: float) -> dict:
 # API CLIENTS
 # =============================================================================
 
-def get_maps_client() -> googlemaps.Client:
-    """Initialize Google Maps client."""
+def is_transient_api_error(error: Exception) -> bool:
+    """True for errors worth retrying: rate limits, server errors, network failures."""
+    import googlemaps
+    from google.genai import errors as genai_errors
+    
+    if isinstance(error, (googlemaps.exceptions.Timeout, googlemaps.exceptions.TransportError)):
+        return True
+    if isinstance(error, googlemaps.exceptions.ApiError):
+        return error.status in ("OVER_QUERY_LIMIT", "UNKNOWN_ERROR")
+    if isinstance(error, genai_errors.APIError):
+        return error.code == 429 or error.code >= 500
+    return False
+
+
+def retry_with_backoff(
+    max_retries: int = MAX_API_RETRIES,
+    base_delay: float = RETRY_BASE_DELAY_SECONDS,
+    max_delay: float = RETRY_MAX_DELAY_SECONDS
+):
+    """
+    Decorator: retry transient API errors with exponential backoff and full jitter.
+    
+    Only sleeps when a call actually fails with a retryable error; permanent
+    errors (bad request, not found) are raised immediately.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            for attempt in range(max_retries + 1):
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as e:
+                    if attempt == max_retries or not is_transient_api_error(e):
+                        raise
+                    delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+                    logger.warning(f"[Retry] {fn.__name__} failed ({e}), retrying in {delay:.1f}s")
+                    time.sleep(delay)
+        return wrapper
+    return decorator
+
+
+@functools.lru_cache(maxsize=2)
+def get_maps_client(cached: bool = False) -> googlemaps.Client:
+    """
+    Shared Google Maps client.
+    
+    One client per process keeps its HTTP session's keep-alive connection
+    pool warm across places, batch workers and server requests.
+    
+    Args:
+        cached: Serve lookups from the on-disk API cache. Only for the offline
+            ingestion pipeline; live server requests must see fresh data.
+    """
     api_key = os.getenv("GOOGLE_MAPS_API_KEY")
     if not api_key:
         raise ValueError("GOOGLE_MAPS_API_KEY environment variable not set")
-    return googlemaps.Client(key=api_key)
+    import googlemaps
+    client = googlemaps.Client(key=api_key)
+    return wrap_maps_client(client) if cached else client
 
 
+@functools.lru_cache(maxsize=1)
 def get_genai_client() -> genai.Client:
-    """Initialize Google GenAI client."""
+    """Shared Google GenAI client (one connection pool per process)."""
     api_key = os.getenv("GEMINI_API_KEY_CAPSTONE_1")
     if not api_key:
         raise ValueError("GEMINI_API_KEY_CAPSTONE_1 environment variable not set")
+    from google import genai
     return genai.Client(api_key=api_key)
 
 
@@ -152,6 +330,7 @@ def get_genai_client() -> genai.Client:
 # STAGE 1: HARD DATA (Google Maps)
 # =============================================================================
 
+@retry_with_backoff()
 def fetch_maps_data(place_name: str, gmaps: googlemaps.Client) -> dict:
     """
     Stage 1: Fetch hard data from Google Maps Places API.
@@ -180,24 +359,26 @@ def fetch_maps_data(place_name: str, gmaps: googlemaps.Client) -> dict:
     
     logger.info(f"[Stage 1] Found place_id: {place_id}")
     
-    # Fetch detailed place information
-    details = gmaps.place(
-        place_id=place_id,
-        fields=[
-            "name",
-            "formatted_address",
-            "geometry",
-            "rating",
-            "user_ratings_total",
-            "price_level",
-            "website",
-            "opening_hours",
-            "photo",
-            "url"
-        ]
-    )
-    
+    # Fetch Basic-tier details first (cheap) to locate the place
+    details = gmaps.place(place_id=place_id, fields=BASIC_FIELDS)
     result = details.get("result", {})
+    location = (result.get("geometry") or EMPTY_SECTION).get("location") or EMPTY_SECTION
+    
+    # Premium fields are only worth paying for when the place is in range
+    if location.get("lat") is not None and location.get("lng") is not None:
+        in_range = check_distance_from_kodaikanal(location["lat"], location["lng"])["is_within_range"]
+    else:
+        in_range = True
+    
+    if in_range:
+        premium = gmaps.place(place_id=place_id, fields=PREMIUM_FIELDS)
+        result.update(premium.get("result", {}))
+    else:
+        logger.info(f"[Stage 1] Out of range, skipping premium details for: {place_id}")
+        # Text search already carries the basics we'd otherwise lose
+        for key in ("formatted_address", "rating", "user_ratings_total"):
+            if key in place:
+                result.setdefault(key, place[key])
     
     # Extract photo reference (top 1) and build photo URL
     photo_reference = None
@@ -213,8 +394,8 @@ def fetch_maps_data(place_name: str, gmaps: googlemaps.Client) -> dict:
         "place_id": place_id,
         "name": result.get("name", place_name),
         "formatted_address": result.get("formatted_address", ""),
-        "lat": result.get("geometry", {}).get("location", {}).get("lat"),
-        "lng": result.get("geometry", {}).get("location", {}).get("lng"),
+        "lat": location.get("lat"),
+        "lng": location.get("lng"),
         "rating": result.get("rating"),
         "user_ratings_total": result.get("user_ratings_total", 0),
         "price_level": result.get("price_level"),
@@ -234,7 +415,26 @@ def fetch_maps_data(place_name: str, gmaps: googlemaps.Client) -> dict:
 # STAGE 2: SOFT DATA (Gemini 3.0 Flash)
 # =============================================================================
 
-def fetch_gemini_data(place_name: str, maps_data: dict, client: genai.Client) -> dict:
+@retry_with_backoff()
+def generate_gemini_content(client: genai.Client, prompt: str):
+    """Grounded Gemini generation call (retried on rate limits / server errors)."""
+    from google.genai import types
+    return client.models.generate_content(
+        model="gemini-2.0-flash",
+        contents=prompt,
+        config=types.GenerateContentConfig(
+            tools=[types.Tool(google_search=types.GoogleSearch())],
+            temperature=0.7,
+        )
+    )
+
+
+def fetch_gemini_data(
+    place_name: str,
+    maps_data: dict,
+    client: genai.Client,
+    use_cache: bool = True
+) -> dict:
     """
     Stage 2: Fetch soft data from Gemini 3.0 Flash with Google Search grounding.
     
@@ -242,20 +442,29 @@ def fetch_gemini_data(place_name: str, maps_data: dict, client: genai.Client) ->
         place_name: Name of the place
         maps_data: Hard data from Google Maps
         client: GenAI client instance
+        use_cache: Reuse a cached answer for the same prompt. The fresh answer
+            is cached either way.
     
     Returns:
         Dictionary with AI-generated soft data
     """
-    logger.info(f"[Stage 2] Querying Gemini for soft data on: {place_name}")
-    
     # Build context from Maps data
-    maps_context = json.dumps({
+    context = {
         "name": maps_data.get("name"),
         "address": maps_data.get("formatted_address"),
         "rating": maps_data.get("rating"),
         "reviews": maps_data.get("user_ratings_total"),
         "price_level": maps_data.get("price_level"),
-    }, indent=2)
+    }
+    
+    # Same place + same Maps context = same prompt; reuse the earlier answer
+    cached = cache_get(GEMINI_CACHE_NAMESPACE, (place_name, context)) if use_cache else None
+    if cached is not None:
+        logger.info(f"[Stage 2] Using cached Gemini data for: {place_name}")
+        return apply_gemini_schema(cached)
+    
+    logger.info(f"[Stage 2] Querying Gemini for soft data on: {place_name}")
+    maps_context = json.dumps(context, indent=2)
     
     system_prompt = f"""You are a Kodaikanal travel expert. Research '{place_name}'.
 Use the official Google Maps data provided here as context: {maps_context}
@@ -276,30 +485,23 @@ IMPORTANT: Return ONLY the JSON object, no markdown formatting, no code blocks,
 
     try:
         # Configure the model with google_search tool for grounding
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=system_prompt,
-            config=types.GenerateContentConfig(
-                tools=[types.Tool(google_search=types.GoogleSearch())],
-                temperature=0.7,
-            )
-        )
+        response = generate_gemini_content(client, system_prompt)
         
         # Extract response text
         response_text = response.text.strip()
         
         # Try to parse JSON from response
-        # Handle potential markdown code blocks
+        # Handle potential markdown code blocks (pure JSON skips the regex)
         if response_text.startswith("```"):
             # Extract JSON from code block
-            json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response_text)
+            json_match = _FENCE_RE.search(response_text)
             if json_match:
                 response_text = json_match.group(1)
         
-        gemini_data = json.loads(response_text)
+        gemini_data = apply_gemini_schema(orjson.loads(response_text))
         
         # Extract grounding sources if available
-        sources = gemini_data.get("source_links", [])
+        sources = gemini_data["source_links"]
         
         # Also check for grounding metadata in response
         if hasattr(response, 'candidates') and response.candidates:
@@ -315,9 +517,10 @@ IMPORTANT: Return ONLY the JSON object, no markdown formatting, no code blocks,
         gemini_data["source_links"] = sources
         
         logger.info(f"[Stage 2] Gemini data retrieved successfully with {len(sources)} sources")
+        cache_put(GEMINI_CACHE_NAMESPACE, (place_name, context), None, gemini_data)
         return gemini_data
         
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"[Stage 2] Failed to parse Gemini response as JSON: {e}")
         logger.error(f"[Stage 2] Raw response: {response_text[:500]}...")
         return get_default_gemini_data()
@@ -326,9 +529,25 @@ IMPORTANT: Return ONLY the JSON object, no markdown formatting, no code blocks,
         return get_default_gemini_data()
 
 
+def apply_gemini_schema(raw: dict) -> dict:
+    """
+    Project a parsed Gemini answer onto GEMINI_FIELD_DEFAULTS.
+    
+    Missing or null fields get their default and unknown fields are dropped,
+    so downstream code can index the result directly.
+    """
+    data = {}
+    for field, default in GEMINI_FIELD_DEFAULTS.items():
+        value = raw.get(field)
+        if value is None:
+            value = list(default) if isinstance(default, list) else default
+        data[field] = value
+    return data
+
+
 def get_default_gemini_data() -> dict:
     """Return default values when Gemini fails."""
-    return {
+    return apply_gemini_schema({
         "avg_time_spent_minutes": 60,
         "peak_hours": [10, 11, 12],
         "tags": ["Scenic", "Nature", "Tourism", "Kodaikanal", "Hill Station", "Photography", "Sightseeing"],
@@ -342,13 +561,136 @@ def get_default_gemini_data() -> dict:
         ],
         "hero_image_url": None,
         "source_links": []
-    }
+    })
 
 
 # =============================================================================
 # STAGE 3: CLUSTERING (Distance Matrix)
 # =============================================================================
 
+def _assign_cluster(elements: list) -> dict:
+    """Apply the nearest-center + threshold rule to one Distance Matrix row."""
+    # Extract distances
+    distances = {}
+    for name, element in zip(CLUSTER_NAMES, elements):
+        if element.get("status") == "OK":
+            distance_meters = element["distance"]["value"]
+            distance_km = distance_meters / 1000.0
+            distances[name] = distance_km
+            logger.debug(f"  Distance to {name}: {distance_km:.2f} km")
+    
+    if not distances:
+        logger.warning("[Stage 3] No valid distances returned, defaulting to Outskirts")
+        return {
+            "cluster_zone": "Outskirts",
+            "nearest_cluster": CLUSTER_NAMES[0],
+            "distance_km": None
+        }
+    
+    # Find nearest cluster
+    nearest_cluster = min(distances, key=distances.get)
+    nearest_distance = distances[nearest_cluster]
+    
+    # Apply threshold rule
+    if nearest_distance < CLUSTER_DISTANCE_THRESHOLD_KM:
+        cluster_zone = nearest_cluster
+        logger.info(f"[Stage 3] Assigned to cluster: {cluster_zone} ({nearest_distance:.2f} km)")
+        return {
+            "cluster_zone": cluster_zone,
+            "nearest_cluster": None,
+            "distance_km": nearest_distance
+        }
+    else:
+        logger.info(f"[Stage 3] Assigned to Outskirts (nearest: {nearest_cluster} at {nearest_distance:.2f} km)")
+        return {
+            "cluster_zone": "Outskirts",
+            "nearest_cluster": nearest_cluster,
+            "distance_km": nearest_distance
+        }
+
+
+def _local_cluster(distances_km: np.ndarray) -> Optional[dict]:
+    """
+    Assign a cluster from straight-line distances when the answer is obvious.
+    
+    Only used when the nearest center is within CLUSTER_FAST_PATH_KM and every
+    other center is at least twice as far; hill roads make anything less
+    certain worth a Distance Matrix call.
+    """
+    order = np.argsort(distances_km)
+    nearest_km = float(distances_km[order[0]])
+    runner_up_km = float(distances_km[order[1]]) if len(order) > 1 else np.inf
+    if nearest_km >= CLUSTER_FAST_PATH_KM or runner_up_km < 2 * nearest_km:
+        return None
+    
+    cluster_zone = CLUSTER_NAMES[order[0]]
+    logger.info(f"[Stage 3] Assigned to cluster: {cluster_zone} ({nearest_km:.2f} km straight-line, no API call)")
+    return {
+        "cluster_zone": cluster_zone,
+        "nearest_cluster": None,
+        "distance_km": round(nearest_km, 3)
+    }
+
+
+def calculate_clusters_batch(latlngs: List[Tuple[float, float]], gmaps: googlemaps.Client) -> List[dict]:
+    """
+    Stage 3 for many places: one Distance Matrix call per 25 origins.
+    
+    Places sitting right next to a single cluster center are assigned locally
+    (see _local_cluster). The rest go out in calls of up to
+    DISTANCE_MATRIX_MAX_ELEMENTS // len(CLUSTER_CENTERS) origins against all
+    cluster centers, and the rows are split back per place.
+    
+    Args:
+        latlngs: (lat, lng) of each place
+        gmaps: Google Maps client instance
+    
+    Returns:
+        Cluster dicts (cluster_zone, nearest_cluster, distance_km), in input order
+    """
+    clusters = [None] * len(latlngs)
+    if not latlngs:
+        return clusters
+    
+    # Zero-quota fast path for obvious cases
+    lats, lngs = zip(*latlngs)
+    pending = []
+    for i, distances_km in enumerate(cluster_center_distances(lats, lngs)):
+        clusters[i] = _local_cluster(distances_km)
+        if clusters[i] is None:
+            pending.append(i)
+    
+    origins_per_call = max(1, DISTANCE_MATRIX_MAX_ELEMENTS // len(CLUSTER_DEST_STRINGS))
+    
+    for start in range(0, len(pending), origins_per_call):
+        chunk = pending[start:start + origins_per_call]
+        logger.info(f"[Stage 3] Calculating clusters for {len(chunk)} place(s)")
+        
+        try:
+            result = gmaps.distance_matrix(
+                origins=[f"{latlngs[i][0]},{latlngs[i][1]}" for i in chunk],
+                # googlemaps reads a bare tuple as one (lat, lng) pair, so pass a list
+                destinations=list(CLUSTER_DEST_STRINGS),
+                mode="driving"
+            )
+        except Exception as e:
+            logger.error(f"[Stage 3] Distance Matrix API error: {e}")
+            for i in chunk:
+                clusters[i] = {
+                    "cluster_zone": "Outskirts",
+                    "nearest_cluster": None,
+                    "distance_km": None
+                }
+            continue
+        
+        rows = result.get("rows", [])
+        for row_idx, i in enumerate(chunk):
+            elements = rows[row_idx].get("elements", []) if row_idx < len(rows) else []
+            clusters[i] = _assign_cluster(elements)
+    
+    return clusters
+
+
 def calculate_cluster(lat: float, lng: float, gmaps: googlemaps.Client) -> dict:
     """
     Stage 3: Calculate cluster zone using Google Distance Matrix API.
@@ -362,65 +704,7 @@ def calculate_cluster(lat: float, lng: float, gmaps: googlemaps.Client) -> dict:
         Dictionary with cluster_zone, nearest_cluster, and distance info
     """
     logger.info(f"[Stage 3] Calculating cluster for coordinates: ({lat}, {lng})")
-    
-    origin = f"{lat},{lng}"
-    destinations = [f"{center[0]},{center[1]}" for center in CLUSTER_CENTERS.values()]
-    
-    try:
-        # Call Distance Matrix API
-        result = gmaps.distance_matrix(
-            origins=[origin],
-            destinations=destinations,
-            mode="driving"
-        )
-        
-        # Extract distances
-        distances = {}
-        elements = result.get("rows", [{}])[0].get("elements", [])
-        
-        for i, (name, _) in enumerate(CLUSTER_CENTERS.items()):
-            if i < len(elements) and elements[i].get("status") == "OK":
-                distance_meters = elements[i]["distance"]["value"]
-                distance_km = distance_meters / 1000.0
-                distances[name] = distance_km
-                logger.debug(f"  Distance to {name}: {distance_km:.2f} km")
-        
-        if not distances:
-            logger.warning("[Stage 3] No valid distances returned, defaulting to Outskirts")
-            return {
-                "cluster_zone": "Outskirts",
-                "nearest_cluster": list(CLUSTER_CENTERS.keys())[0],
-                "distance_km": None
-            }
-        
-        # Find nearest cluster
-        nearest_cluster = min(distances, key=distances.get)
-        nearest_distance = distances[nearest_cluster]
-        
-        # Apply threshold rule
-        if nearest_distance < CLUSTER_DISTANCE_THRESHOLD_KM:
-            cluster_zone = nearest_cluster
-            logger.info(f"[Stage 3] Assigned to cluster: {cluster_zone} ({nearest_distance:.2f} km)")
-            return {
-                "cluster_zone": cluster_zone,
-                "nearest_cluster": None,
-                "distance_km": nearest_distance
-            }
-        else:
-            logger.info(f"[Stage 3] Assigned to Outskirts (nearest: {nearest_cluster} at {nearest_distance:.2f} km)")
-            return {
-                "cluster_zone": "Outskirts",
-                "nearest_cluster": nearest_cluster,
-                "distance_km": nearest_distance
-            }
-            
-    except Exception as e:
-        logger.error(f"[Stage 3] Distance Matrix API error: {e}")
-        return {
-            "cluster_zone": "Outskirts",
-            "nearest_cluster": None,
-            "distance_km": None
-        }
+    return calculate_clusters_batch([(lat, lng)], gmaps)[0]
 
 
 def calculate_popularity_score(review_count: int) -> float:
@@ -428,6 +712,11 @@ def calculate_popularity_score(review_count: int) -> float:
     return (review_count / POPULARITY_NORMALIZATION) * 100
 
 
+def calculate_popularity_scores(review_counts) -> np.ndarray:
+    """Vectorized calculate_popularity_score over an array of review counts."""
+    return (np.asarray(review_counts, dtype=np.float64) / POPULARITY_NORMALIZATION) * 100
+
+
 # =============================================================================
 # OUTPUT FUNCTIONS
 # =============================================================================
@@ -436,6 +725,14 @@ def calculate_popularity_score(review_count: int) -> float:
 MASTER_JSON_PATH = DATA_DIR / "kodaikanal_places.json"
 
 
+# Shared keep-alive session for photo downloads; the pool covers every download worker
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=IMAGE_DOWNLOAD_WORKERS, pool_maxsize=2 * IMAGE_DOWNLOAD_WORKERS)
+)
+
+
 def download_place_image(place_slug: str, photo_reference: str) -> Optional[str]:
     """
     Download a place image from Google Maps and save it locally.
@@ -447,8 +744,6 @@ def download_place_image(place_slug: str, photo_reference: str) -> Optional[str]
     Returns:
         Relative path to saved image (e.g. 'images/bryant-park-kodaikanal.jpg'), or None on failure
     """
-    import requests
-    
     api_key = os.getenv('GOOGLE_MAPS_API_KEY')
     if not api_key or not photo_reference:
         return None
@@ -465,7 +760,7 @@ def download_place_image(place_slug: str, photo_reference: str) -> Optional[str]
     google_url = f"https://maps.googleapis.com/maps/api/place/photo?maxwidth=800&photo_reference={photo_reference}&key={api_key}"
     
     try:
-        response = requests.get(google_url, timeout=15)
+        response = _HTTP_SESSION.get(google_url, timeout=15)
         if response.status_code == 200 and 'image' in response.headers.get('Content-Type', ''):
             with open(image_path, 'wb') as f:
                 f.write(response.content)
@@ -479,13 +774,32 @@ def download_place_image(place_slug: str, photo_reference: str) -> Optional[str]
         return None
 
 
+def download_place_images(
+    pairs: List[Tuple[str, str]],
+    max_workers: int = IMAGE_DOWNLOAD_WORKERS
+) -> List[Optional[str]]:
+    """
+    Download many place images in parallel over one pooled session.
+    
+    Args:
+        pairs: (place_slug, photo_reference) tuples
+        max_workers: Maximum concurrent downloads
+    
+    Returns:
+        Relative image paths (or None on failure), in the same order as pairs
+    """
+    if not pairs:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda pair: download_place_image(*pair), pairs))
+
+
 def load_master_json() -> dict:
     """Load the master JSON file, or create empty structure if not exists."""
     DATA_DIR.mkdir(exist_ok=True)
     
     if MASTER_JSON_PATH.exists():
-        with open(MASTER_JSON_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return load_json_file(MASTER_JSON_PATH)
     
     return {
         "places": [],
@@ -494,17 +808,77 @@ def load_master_json() -> dict:
     }
 
 
+class PlacesIndex:
+    """
+    Name lookup and popularity ordering over master places, built in one pass.
+    
+    - contains(name): O(1) case-insensitive membership check
+    - add(place): O(log N) insert, no full re-sort
+    - top_n(n): most popular places by popularity_score
+    """
+    
+    __slots__ = ('_by_name', '_top_heap')
+    
+    def __init__(self, places: Optional[list] = None):
+        self._by_name = {}
+        self._top_heap = []
+        for place in places or []:
+            self._by_name[place.get("name", "").lower()] = place
+            self._top_heap.append(self._heap_entry(place))
+        heapq.heapify(self._top_heap)
+    
+    @classmethod
+    def from_master(cls) -> "PlacesIndex":
+        """Build the index from the master JSON file."""
+        return cls(load_master_json().get("places", []))
+    
+    @staticmethod
+    def _heap_entry(place: dict) -> tuple:
+        score = (place.get("stats") or EMPTY_SECTION).get("popularity_score") or 0
+        return (-score, place.get("id", ""), place)
+    
+    def __len__(self) -> int:
+        return len(self._by_name)
+    
+    def add(self, place: dict) -> None:
+        """Insert (or replace, by name) a place."""
+        self._by_name[place.get("name", "").lower()] = place
+        heapq.heappush(self._top_heap, self._heap_entry(place))
+    
+    def contains(self, name: str) -> bool:
+        """Check whether a place name is already indexed (case-insensitive)."""
+        return name.lower() in self._by_name
+    
+    def top_n(self, n: int) -> list:
+        """Return the n most popular places, highest popularity_score first."""
+        k = n
+        while True:
+            result = []
+            seen = set()
+            for _, place_id, place in heapq.nsmallest(k, self._top_heap):
+                # Skip entries superseded by a later add() of the same name
+                if self._by_name.get(place.get("name", "").lower()) is not place or place_id in seen:
+                    continue
+                seen.add(place_id)
+                result.append(place)
+            if len(result) >= n or k >= len(self._top_heap):
+                return result[:n]
+            k *= 2
+
+
 def update_popularity_ranks(places: list) -> list:
     """
     Update popularity_rank for all places based on popularity_score.
     Rank 1 = highest popularity_score.
     """
-    # Sort by popularity_score descending
-    sorted_places = sorted(
-        places,
-        key=lambda x: x.get("stats", {}).get("popularity_score", 0),
-        reverse=True
+    # Sort by popularity_score descending (stable, so ties keep their order)
+    scores = np.fromiter(
+        ((place.get("stats") or EMPTY_SECTION).get("popularity_score") or 0.0 for place in places),
+        dtype=np.float64,
+        count=len(places)
     )
+    order = np.argsort(-scores, kind="stable")
+    sorted_places = [places[i] for i in order]
     
     # Assign ranks (1-indexed)
     for rank, place in enumerate(sorted_places, start=1):
@@ -513,56 +887,153 @@ def update_popularity_ranks(places: list) -> list:
     return sorted_places
 
 
-def save_to_master_json(place_data: dict) -> Path:
+class MasterStore:
+    """
+    In-memory view of the master JSON for batch ingestion.
+    
+    Loads the file once, upserts places in O(1) (by id or google_place_id),
+    and writes everything back in one flush() - so ingesting N places costs a
+    single rank sort and a single file write instead of N of each.
+    """
+    
+    __slots__ = ('_master', '_places', '_ids_by_google_id', '_pending_images', '_lock')
+    
+    def __init__(self, master: Optional[dict] = None):
+        self._master = master if master is not None else load_master_json()
+        self._places = {}
+        self._ids_by_google_id = {}
+        self._pending_images = []
+        self._lock = threading.Lock()
+        for place in self._master.get("places", []):
+            self._index(place)
+    
+    def _index(self, place: dict) -> None:
+        self._places[place.get("id")] = place
+        google_place_id = place.get("google_place_id")
+        if google_place_id:
+            self._ids_by_google_id[google_place_id] = place.get("id")
+    
+    def __len__(self) -> int:
+        return len(self._places)
+    
+    def get(self, place_id: str) -> Optional[dict]:
+        """Look up a place by its slug id."""
+        return self._places.get(place_id)
+    
+    def rescore(self) -> None:
+        """Recompute popularity scores for every stored place (written on flush)."""
+        with self._lock:
+            refresh_popularity_scores(list(self._places.values()))
+    
+    def upsert(self, place_data: dict) -> None:
+        """Add or replace a place (matched by id, then google_place_id)."""
+        place_id = place_data.get("id")
+        with self._lock:
+            existing_id = place_id if place_id in self._places else \
+                self._ids_by_google_id.get(place_data.get("google_place_id"))
+            if existing_id is not None:
+                logger.info(f"[Output] Updating existing place: {place_id}")
+                del self._places[existing_id]
+            else:
+                logger.info(f"[Output] Adding new place: {place_id}")
+            self._index(place_data)
+    
+    def attach_image(self, place_data: dict, image_future: Future) -> None:
+        """Fill place_data's local_image from an in-flight download at flush time."""
+        with self._lock:
+            self._pending_images.append((place_data, image_future))
+    
+    def _resolve_images(self) -> None:
+        for place_data, image_future in self._pending_images:
+            try:
+                place_data["content"]["local_image"] = image_future.result(timeout=IMAGE_DOWNLOAD_TIMEOUT_SECONDS)
+            except Exception as e:
+                logger.warning(f"[Image] Download for {place_data.get('id')} did not finish: {e}")
+        self._pending_images.clear()
+    
+    def flush(self, timestamp: Optional[str] = None) -> Path:
+        """
+        Recalculate popularity ranks and write the master JSON once.
+        
+        Args:
+            timestamp: ISO timestamp for last_updated (defaults to now)
+        """
+        with self._lock:
+            self._resolve_images()
+            places = update_popularity_ranks(list(self._places.values()))
+            self._master["places"] = places
+            self._master["total_count"] = len(places)
+            self._master["last_updated"] = timestamp or datetime.now(timezone.utc).isoformat()
+            
+            with _MASTER_LOCK:
+                dump_json_file(MASTER_JSON_PATH, self._master)
+        
+        logger.info(f"[Output] Saved to master JSON: {MASTER_JSON_PATH} ({len(places)} places)")
+        return MASTER_JSON_PATH
+
+
+def refresh_popularity_scores(places: list) -> list:
+    """
+    Recompute every place's popularity_score from its review_count in one
+    vectorized pass (e.g. after changing POPULARITY_NORMALIZATION), then re-rank.
+    """
+    review_counts = np.fromiter(
+        ((place.get("stats") or EMPTY_SECTION).get("review_count") or 0 for place in places),
+        dtype=np.float64,
+        count=len(places)
+    )
+    scores = calculate_popularity_scores(review_counts)
+    for place, score in zip(places, scores.tolist()):
+        # Python round() so stored values match build_place_data exactly
+        place["stats"]["popularity_score"] = round(score, 2)
+    return update_popularity_ranks(places)
+
+
+def save_to_master_json(place_data: dict) -> dict:
     """
     Add or update a place in the master JSON file.
     Automatically recalculates popularity_rank for all places.
     
+    For many places, share one MasterStore and flush() once instead.
+    
     Args:
         place_data: Complete place data object
     
     Returns:
-        Path to the master JSON file
+        The same place_data, with its popularity_rank filled in
     """
-    master = load_master_json()
-    places = master.get("places", [])
-    
-    # Check if place already exists (by id or google_place_id)
-    place_id = place_data.get("id")
-    google_place_id = place_data.get("google_place_id")
-    
-    existing_index = None
-    for i, p in enumerate(places):
-        if p.get("id") == place_id or p.get("google_place_id") == google_place_id:
-            existing_index = i
-            break
-    
-    if existing_index is not None:
-        # Update existing place
-        logger.info(f"[Output] Updating existing place: {place_id}")
-        places[existing_index] = place_data
-    else:
-        # Add new place
-        logger.info(f"[Output] Adding new place: {place_id}")
-        places.append(place_data)
-    
-    # Recalculate popularity ranks for all places
-    places = update_popularity_ranks(places)
-    
-    # Update master structure
-    master["places"] = places
-    master["total_count"] = len(places)
-    master["last_updated"] = datetime.now(timezone.utc).isoformat()
-    
-    # Save to file
-    with open(MASTER_JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(master, f, indent=2, ensure_ascii=False)
-    
-    logger.info(f"[Output] Saved to master JSON: {MASTER_JSON_PATH} ({len(places)} places)")
-    
-    return MASTER_JSON_PATH
+    with _MASTER_LOCK:
+        store = MasterStore()
+        store.upsert(place_data)
+        store.flush()
+    return place_data
 
 
+def is_place_fresh(place: dict, ttl_days: float = REINGEST_TTL_DAYS) -> bool:
+    """
+    True if a stored place is complete and was updated within ttl_days.
+    
+    Complete means it has coordinates, a cluster, a summary and tags - the
+    fields that need the Maps, Distance Matrix and Gemini stages.
+    """
+    location = place.get("location") or EMPTY_SECTION
+    content = place.get("content") or EMPTY_SECTION
+    if not (location.get("lat") and location.get("lng") and location.get("cluster_zone")
+            and content.get("short_summary") and content.get("tags")):
+        return False
+    
+    last_updated = (place.get("metadata") or EMPTY_SECTION).get("last_updated")
+    if not last_updated:
+        return False
+    try:
+        updated_at = datetime.fromisoformat(last_updated)
+    except ValueError:
+        return False
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    age_days = (datetime.now(timezone.utc) - updated_at).total_seconds() / 86400
+    return age_days < ttl_days
+
 
 def get_top_places(n: int = 10) -> list:
     """Get top N places by popularity rank."""
@@ -573,24 +1044,34 @@ def get_top_places(n: int = 10) -> list:
     return places[:n]
 
 
+def make_place_slug(place_name: str) -> str:
+    """Place ID / image filename for a place name (e.g. 'bryant-park-kodaikanal')."""
+    return slugify(f"{place_name}-kodaikanal")
+
+
 def build_place_data(
     maps_data: dict,
     gemini_data: dict,
-    cluster_data: dict
+    cluster_data: dict,
+    local_image: Optional[str] = None,
+    timestamp: Optional[str] = None
 ) -> dict:
     """
     Build the place data structure for a single place.
     
     Args:
         maps_data: Stage 1 data from Google Maps
-        gemini_data: Stage 2 data from Gemini
+        gemini_data: Stage 2 data from Gemini (shaped by apply_gemini_schema)
         cluster_data: Stage 3 clustering data
+        local_image: Relative path of the downloaded photo, if any
+        timestamp: ISO timestamp for metadata.last_updated (defaults to now;
+            batch runs pass one run timestamp for every place)
     
     Returns:
         Complete place data object (without popularity_rank - that's assigned during save)
     """
     place_name = maps_data.get("name", "Unknown Place")
-    slug = slugify(f"{place_name}-kodaikanal")
+    slug = make_place_slug(place_name)
     
     review_count = maps_data.get("user_ratings_total", 0)
     popularity_score = calculate_popularity_score(review_count)
@@ -604,7 +1085,7 @@ def build_place_data(
     
     # Use Gemini's itinerary_include decision (defaults to True for tourist attractions)
     # Gemini determines if it's a service/transport (false) or tourist destination (true)
-    itinerary_include = gemini_data.get("itinerary_include", True)
+    itinerary_include = gemini_data["itinerary_include"]
     
     place_data = {
         "id": slug,
@@ -624,43 +1105,36 @@ def build_place_data(
             "rating": maps_data.get("rating"),
             "review_count": review_count,
             "popularity_score": round(popularity_score, 2),
-            "popularity_rank": None,  # Will be set by save_to_master_json
+            "popularity_rank": None,  # Set by save_to_master_json / MasterStore.flush
             "price_level": maps_data.get("price_level")
         },
         
         "logic": {
-            "avg_time_spent_minutes": gemini_data.get("avg_time_spent_minutes", 60),
+            "avg_time_spent_minutes": gemini_data["avg_time_spent_minutes"],
             "opening_hours": opening_hours,
-            "peak_hours": gemini_data.get("peak_hours", []),
-            "difficulty": gemini_data.get("difficulty", "Easy")
+            "peak_hours": gemini_data["peak_hours"],
+            "difficulty": gemini_data["difficulty"]
         },
         
         "content": {
-            "short_summary": gemini_data.get("short_summary", ""),
-            "tags": gemini_data.get("tags", [])[:7],  # Ensure max 7 tags
-            "best_time_text": gemini_data.get("best_time_text", ""),
-            "tips": gemini_data.get("tips", [])[:3],  # Ensure max 3 tips
-            "hero_image_url": gemini_data.get("hero_image_url"),
+            "short_summary": gemini_data["short_summary"],
+            "tags": gemini_data["tags"][:7],  # Ensure max 7 tags
+            "best_time_text": gemini_data["best_time_text"],
+            "tips": gemini_data["tips"][:3],  # Ensure max 3 tips
+            "hero_image_url": gemini_data["hero_image_url"],
             "photo_reference": maps_data.get("photo_reference"),
-            "local_image": None  # Will be set after image download
+            "local_image": local_image
         },
         
-        "sources": gemini_data.get("source_links", []),
+        "sources": gemini_data["source_links"],
         
         "metadata": {
             "added_by": "system",
-            "last_updated": datetime.now(timezone.utc).isoformat(),
+            "last_updated": timestamp or datetime.now(timezone.utc).isoformat(),
             "itinerary_include": itinerary_include
         }
     }
     
-    # Download and store image locally
-    photo_ref = maps_data.get("photo_reference")
-    if photo_ref:
-        local_path = download_place_image(slug, photo_ref)
-        if local_path:
-            place_data["content"]["local_image"] = local_path
-    
     return place_data
 
 
@@ -668,27 +1142,74 @@ def build_place_data(
 # MAIN PIPELINE
 # =============================================================================
 
-def fetch_place_data(place_name: str) -> dict:
+def fetch_place_data(
+    place_name: str,
+    store: Optional[MasterStore] = None,
+    force: bool = False
+) -> dict:
     """
     Main pipeline function: Fetch complete data for a place.
     
     Args:
         place_name: Name of the place (e.g., "Dolphin's Nose")
+        store: Shared MasterStore for batch runs; the caller flushes it.
+            When omitted, the place is saved to the master JSON immediately.
+        force: Refetch even if the place is already stored and fresh
     
     Returns:
         Complete place data object with distance_info for validation
+        (the stored object, without distance_info, if it was still fresh)
     """
+    if not force:
+        existing = (store if store is not None else MasterStore()).get(make_place_slug(place_name))
+        if existing and is_place_fresh(existing):
+            logger.info(f"[Skip] {place_name} is already ingested and fresh (use force to refetch)")
+            return existing
+    
     logger.info(f"=" * 60)
     logger.info(f"Starting pipeline for: {place_name}")
     logger.info(f"=" * 60)
     
-    # Initialize clients
-    gmaps = get_maps_client()
+    # Initialize clients (a forced refetch bypasses the API disk cache)
+    gmaps = get_maps_client(cached=not force)
     genai_client = get_genai_client()
     
     # Stage 1: Hard Data
     maps_data = fetch_maps_data(place_name, gmaps)
     
+    def resolve_cluster() -> dict:
+        lat, lng = maps_data.get("lat"), maps_data.get("lng")
+        if lat and lng:
+            return calculate_cluster(lat, lng, gmaps)
+        logger.warning("No coordinates available, skipping clustering")
+        return {"cluster_zone": "Unknown", "nearest_cluster": None, "distance_km": None}
+    
+    return _complete_place(
+        place_name, maps_data, resolve_cluster, genai_client, store, use_cache=not force
+    )
+
+
+def _complete_place(
+    place_name: str,
+    maps_data: dict,
+    resolve_cluster: Callable[[], dict],
+    genai_client: genai.Client,
+    store: Optional[MasterStore],
+    timestamp: Optional[str] = None,
+    use_cache: bool = True
+) -> dict:
+    """
+    Run everything after Stage 1 for one place and save it.
+    
+    Args:
+        place_name: Name the pipeline was started with
+        maps_data: Stage 1 data from Google Maps
+        resolve_cluster: Returns the Stage 3 cluster data (runs while Gemini is in flight)
+        genai_client: GenAI client instance
+        store: Shared MasterStore, or None to save immediately
+        timestamp: Run timestamp for last_updated (defaults to now)
+        use_cache: Let Stage 2 reuse a cached Gemini answer (False when forcing)
+    """
     # Check distance from Kodaikanal center
     lat = maps_data.get("lat")
     lng = maps_data.get("lng")
@@ -699,34 +1220,45 @@ def fetch_place_data(place_name: str) -> dict:
         if distance_info.get("warning"):
             logger.warning(f"[Distance Check] {distance_info['warning']}")
     
-    # Stage 2: Soft Data
-    gemini_data = fetch_gemini_data(place_name, maps_data, genai_client)
+    # Stage 2: Soft Data and the photo download run in the background;
+    # both only need Stage 1 output
+    gemini_future = _STAGE_EXECUTOR.submit(
+        fetch_gemini_data, place_name, maps_data, genai_client, use_cache
+    )
+    image_future = None
+    if maps_data.get("photo_reference"):
+        image_future = _STAGE_EXECUTOR.submit(
+            download_place_image,
+            make_place_slug(maps_data.get("name", "Unknown Place")),
+            maps_data["photo_reference"]
+        )
     
-    # Stage 3: Clustering
-    if lat and lng:
-        cluster_data = calculate_cluster(lat, lng, gmaps)
-    else:
-        logger.warning("No coordinates available, skipping clustering")
-        cluster_data = {"cluster_zone": "Unknown", "nearest_cluster": None, "distance_km": None}
+    # Stage 3: Clustering (overlaps Gemini and the download)
+    cluster_data = resolve_cluster()
+    
+    gemini_data = gemini_future.result()
+    
+    # Batch runs don't hold this worker for the download (the store's flush
+    # fills local_image), so the next place's API stages can start right away
+    local_image = None
+    if image_future is not None and store is None:
+        local_image = image_future.result()
     
     # Build place data
-    place_data = build_place_data(maps_data, gemini_data, cluster_data)
+    place_data = build_place_data(maps_data, gemini_data, cluster_data, local_image, timestamp)
+    if image_future is not None and store is not None:
+        store.attach_image(place_data, image_future)
     
     # Add distance info to the returned data
     if distance_info:
         place_data["distance_info"] = distance_info
     
-    # Save to master JSON (automatically updates popularity_rank for all places)
-    save_to_master_json(place_data)
-    
-    # Reload to get the updated popularity_rank
-    master = load_master_json()
-    for p in master["places"]:
-        if p["id"] == place_data["id"]:
-            # Preserve distance_info as it's not saved to JSON
-            p["distance_info"] = distance_info
-            place_data = p
-            break
+    if store is not None:
+        # Batch run: popularity_rank is filled in (in place) when the caller flushes
+        store.upsert(place_data)
+    else:
+        # Ranks are assigned on this same dict, so no reload is needed
+        place_data = save_to_master_json(place_data)
     
     logger.info(f"=" * 60)
     logger.info(f"Pipeline complete for: {place_name}")
@@ -735,6 +1267,108 @@ def fetch_place_data(place_name: str) -> dict:
     return place_data
 
 
+def fetch_places_concurrently(
+    place_names: List[str],
+    max_workers: int = MAX_CONCURRENT_FETCHES,
+    force: bool = False
+) -> List[Tuple[str, Any]]:
+    """
+    Run the pipeline for many places in parallel.
+    
+    Each pipeline run is dominated by network I/O (Maps + Gemini), so a thread
+    pool overlaps the waits. The pool size caps in-flight requests. Stage 1
+    runs for every place first so Stage 3 can cluster the whole batch in
+    ceil(N/25) Distance Matrix calls, and all places go into one MasterStore
+    that is written once at the end.
+    
+    Args:
+        place_names: Names of the places to fetch
+        max_workers: Maximum number of places fetched at once
+        force: Refetch places that are already stored and fresh
+    
+    Returns:
+        List of (place_name, result) tuples in completion order, where result is
+        the place data dict or the Exception raised for that place
+    """
+    results = []
+    if not place_names:
+        return results
+    
+    store = MasterStore()
+    
+    # Fresh places need no API calls at all
+    if not force:
+        pending = []
+        for name in place_names:
+            existing = store.get(make_place_slug(name))
+            if existing and is_place_fresh(existing):
+                logger.info(f"[Skip] {name} is already ingested and fresh")
+                results.append((name, existing))
+            else:
+                pending.append(name)
+        place_names = pending
+        if not place_names:
+            return results
+    
+    # A forced refetch bypasses the API disk cache for Stage 1 and clustering
+    gmaps = get_maps_client(cached=not force)
+    genai_client = get_genai_client()
+    
+    # One timestamp for the whole run (place metadata and the master file agree)
+    run_timestamp = datetime.now(timezone.utc).isoformat()
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Stage 1 for every place
+        maps_futures = {name: executor.submit(fetch_maps_data, name, gmaps) for name in place_names}
+        maps_by_name = {}
+        for name, future in maps_futures.items():
+            try:
+                maps_by_name[name] = future.result()
+            except Exception as e:
+                results.append((name, e))
+        
+        # Stage 3 for the whole batch, in the background
+        located = [
+            name for name, maps_data in maps_by_name.items()
+            if maps_data.get("lat") and maps_data.get("lng")
+        ]
+        located_index = {name: i for i, name in enumerate(located)}
+        clusters_future = _STAGE_EXECUTOR.submit(
+            calculate_clusters_batch,
+            [(maps_by_name[name]["lat"], maps_by_name[name]["lng"]) for name in located],
+            gmaps
+        )
+        
+        def cluster_resolver(name: str) -> Callable[[], dict]:
+            def resolve() -> dict:
+                if name not in located_index:
+                    logger.warning(f"No coordinates available for {name}, skipping clustering")
+                    return {"cluster_zone": "Unknown", "nearest_cluster": None, "distance_km": None}
+                return clusters_future.result()[located_index[name]]
+            return resolve
+        
+        futures = {
+            executor.submit(
+                _complete_place, name, maps_data, cluster_resolver(name),
+                genai_client, store, run_timestamp, not force
+            ): name
+            for name, maps_data in maps_by_name.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results.append((name, future.result()))
+            except Exception as e:
+                results.append((name, e))
+    
+    # Single rank sort + file write for the whole batch (fills popularity_rank in results)
+    fetched = set(place_names)
+    if any(name in fetched and not isinstance(result, Exception) for name, result in results):
+        store.flush(run_timestamp)
+    
+    return results
+
+
 # =============================================================================
 # CLI ENTRY POINT
 # =============================================================================
@@ -757,6 +1391,16 @@ def main():
         metavar="N",
         help="Show top N places by popularity"
     )
+    parser.add_argument(
+        "--rescore",
+        action="store_true",
+        help="Recompute popularity scores and ranks for all stored places"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help=f"Refetch even if the place was ingested in the last {REINGEST_TTL_DAYS} days"
+    )
     
     args = parser.parse_args()
     
@@ -771,11 +1415,18 @@ def main():
         print(f"{'='*60}\n")
         return
     
+    if args.rescore:
+        store = MasterStore()
+        store.rescore()
+        store.flush()
+        print(f"✅ Rescored {len(store)} places")
+        return
+    
     if not args.place_name:
-        parser.error("place_name is required unless using --top")
+        parser.error("place_name is required unless using --top or --rescore")
     
     try:
-        result = fetch_place_data(args.place_name)
+        result = fetch_place_data(args.place_name, force=args.force)
         
         # Print result summary
         print("\n" + "=" * 60)
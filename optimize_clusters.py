@@ -18,11 +18,13 @@ Usage:
 """
 
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 import googlemaps
 
+from json_io import load_json_file, dump_json_file, EMPTY_SECTION
+
 load_dotenv()
 
 # Configuration
@@ -45,8 +47,7 @@ MAIN_CLUSTERS = ['Town Center', 'Forest Circuit', 'Vattakanal', 'Poombarai']
 
 def load_places() -> List[Dict]:
     """Load places from JSON file."""
-    with open(PLACES_PATH, 'r') as f:
-        data = json.load(f)
+    data = load_json_file(PLACES_PATH)
     return data.get('places', [])
 
 
@@ -58,7 +59,7 @@ def bucket_places(places: List[Dict]) -> Dict[str, List[Dict]]:
     buckets = {cluster: [] for cluster in MAIN_CLUSTERS}
     
     for place in places:
-        location = place.get('location', {})
+        location = place.get('location') or EMPTY_SECTION
         cluster_zone = location.get('cluster_zone', '')
         nearest_cluster = location.get('nearest_cluster', '')
         
@@ -86,22 +87,21 @@ def get_anchor_place(places: List[Dict]) -> Optional[Dict]:
     if not places:
         return None
     
-    # Sort by popularity_rank (ascending, 1 is best)
-    sorted_places = sorted(
-        places,
-        key=lambda p: p.get('stats', {}).get('popularity_rank', 999)
-    )
-    return sorted_places[0]
+    # Lowest popularity_rank (1 is best); min() keeps the first on ties like a stable sort
+    return min(places, key=lambda p: (p.get('stats') or EMPTY_SECTION).get('popularity_rank', 999))
 
 
-def optimize_bucket(cluster_name: str, places: List[Dict], gmaps_client) -> List[Dict]:
+def optimize_bucket(cluster_name: str, places: List[Dict], gmaps_client, log=print) -> List[Dict]:
     """
     Optimize a bucket of places using Google Maps Directions API.
     Uses the most popular place as both origin and destination (round trip).
     
+    Progress lines go to log (print by default), so concurrent buckets can
+    buffer their output.
+    
     Returns list of places with order_sequence and travel_time_to_next_min.
     """
-    print(f"\n🔄 Optimizing {cluster_name} ({len(places)} places)")
+    log(f"\n🔄 Optimizing {cluster_name} ({len(places)} places)")
     
     if len(places) < 2:
         # No optimization needed for 0-1 places
@@ -114,16 +114,16 @@ def optimize_bucket(cluster_name: str, places: List[Dict], gmaps_client) -> List
                 'order_sequence': i + 1,
                 'travel_time_to_next_min': 0
             })
-        print(f"  ℹ️ Skipped optimization (< 2 places)")
+        log(f"  ℹ️ Skipped optimization (< 2 places)")
         return result
     
     # Find anchor (most popular place)
     anchor = get_anchor_place(places)
     if not anchor:
-        print(f"  ❌ Could not find anchor place")
+        log(f"  ❌ Could not find anchor place")
         return []
     
-    print(f"  🎯 Anchor: {anchor['name']} (Rank {anchor.get('stats', {}).get('popularity_rank', '?')})")
+    log(f"  🎯 Anchor: {anchor['name']} (Rank {(anchor.get('stats') or EMPTY_SECTION).get('popularity_rank', '?')})")
     
     # Build waypoints (all places except anchor)
     waypoints = []
@@ -148,7 +148,7 @@ def optimize_bucket(cluster_name: str, places: List[Dict], gmaps_client) -> List
         origin = f"place_id:{anchor['google_place_id']}"
         destination = origin  # Round trip
         
-        print(f"  📡 Calling Directions API with {len(waypoints)} waypoints...")
+        log(f"  📡 Calling Directions API with {len(waypoints)} waypoints...")
         
         directions_result = gmaps_client.directions(
             origin=origin,
@@ -159,14 +159,14 @@ def optimize_bucket(cluster_name: str, places: List[Dict], gmaps_client) -> List
         )
         
         if not directions_result:
-            print(f"  ❌ No route found")
+            log(f"  ❌ No route found")
             return []
         
         route = directions_result[0]
         waypoint_order = route.get('waypoint_order', [])
         legs = route.get('legs', [])
         
-        print(f"  ✅ Optimized order: {waypoint_order}")
+        log(f"  ✅ Optimized order: {waypoint_order}")
         
         # Build result list
         result = []
@@ -203,7 +203,7 @@ def optimize_bucket(cluster_name: str, places: List[Dict], gmaps_client) -> List
         return result
         
     except Exception as e:
-        print(f"  ❌ API Error: {e}")
+        log(f"  ❌ API Error: {e}")
         # Return unoptimized order as fallback
         result = []
         for i, place in enumerate(places):
@@ -248,19 +248,27 @@ def main():
     print("\n🚗 ROUTE OPTIMIZATION")
     print("-"*40)
     
-    optimized_routes = {}
+    # One worker per cluster; each buffers its log so the output stays grouped
+    bucket_logs = {cluster: [] for cluster in MAIN_CLUSTERS}
+    with ThreadPoolExecutor(max_workers=len(MAIN_CLUSTERS)) as executor:
+        optimized = executor.map(
+            lambda cluster: optimize_bucket(
+                cluster, buckets.get(cluster, []), gmaps, log=bucket_logs[cluster].append
+            ),
+            MAIN_CLUSTERS
+        )
+        optimized_routes = dict(zip(MAIN_CLUSTERS, optimized))
+    
     for cluster in MAIN_CLUSTERS:
-        cluster_places = buckets.get(cluster, [])
-        optimized = optimize_bucket(cluster, cluster_places, gmaps)
-        optimized_routes[cluster] = optimized
+        for line in bucket_logs[cluster]:
+            print(line)
     
     # Save output
     print("\n💾 SAVING RESULTS")
     print("-"*40)
     
     os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-    with open(OUTPUT_PATH, 'w') as f:
-        json.dump(optimized_routes, f, indent=2)
+    dump_json_file(OUTPUT_PATH, optimized_routes)
     
     print(f"✅ Saved to {OUTPUT_PATH}")
     
@@ -0,0 +1,230 @@
+"""
+Local Route Solver
+==================
+Orders stops into a round-trip tour from a precomputed duration matrix,
+so route optimization needs no Directions API `optimize_waypoints` call
+and is not limited to 25 waypoints.
+
+Usage:
+    from route_solver import optimize_tour, distance_matrix_batched
+    matrix = distance_matrix_batched(gmaps, [f"place_id:{pid}" for pid in place_ids])
+    order = optimize_tour(matrix, start_idx=bus_stand_idx)
+"""
+
+import functools
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# Distance Matrix API caps each request at 100 elements (origins x destinations)
+DISTANCE_MATRIX_MAX_ELEMENTS = 100
+
+# Square tiles that fill one request exactly
+MATRIX_TILE_SIZE = math.isqrt(DISTANCE_MATRIX_MAX_ELEMENTS)
+
+# Tiles requested in parallel (share the client's keep-alive connection pool)
+MAX_PARALLEL_TILES = 4
+
+# Stand-in cost for unreachable pairs so solvers still get a finite graph
+UNREACHABLE_COST = 1e9
+
+
+def distance_matrix_batched(gmaps, locations: List[str], mode: str = 'driving') -> np.ndarray:
+    """
+    Fetch an N x N travel-duration matrix with as few Distance Matrix calls as possible.
+
+    Locations are tiled into MATRIX_TILE_SIZE blocks, so each request returns a
+    full tile of pairs instead of one row or one pair.
+
+    Args:
+        gmaps: Google Maps client
+        locations: Origins/destinations (e.g. "place_id:..." or "lat,lng")
+        mode: Travel mode
+
+    Returns:
+        (N, N) array of durations in seconds; 0 on the diagonal, inf if unreachable
+    """
+    n = len(locations)
+    matrix = np.full((n, n), np.inf)
+    np.fill_diagonal(matrix, 0)
+
+    tiles = [
+        (row, col)
+        for row in range(0, n, MATRIX_TILE_SIZE)
+        for col in range(0, n, MATRIX_TILE_SIZE)
+    ]
+
+    def fetch_tile(tile):
+        row, col = tile
+        return gmaps.distance_matrix(
+            origins=locations[row:row + MATRIX_TILE_SIZE],
+            destinations=locations[col:col + MATRIX_TILE_SIZE],
+            mode=mode
+        )
+
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_TILES) as executor:
+        responses = list(executor.map(fetch_tile, tiles))
+
+    for (row, col), response in zip(tiles, responses):
+        for i, matrix_row in enumerate(response.get('rows', [])):
+            for j, element in enumerate(matrix_row.get('elements', [])):
+                if element.get('status') == 'OK' and row + i != col + j:
+                    matrix[row + i, col + j] = element['duration']['value']
+
+    return matrix
+
+
+def tour_cost(dist_matrix, tour: Sequence[int]) -> float:
+    """Total cost of a closed tour (last stop returns to the first)."""
+    d = np.asarray(dist_matrix, dtype=float)
+    if len(tour) < 2:
+        return 0.0
+    order = np.asarray(tour)
+    return float(d[order, np.roll(order, -1)].sum())
+
+
+def _best_orientation(d: np.ndarray, tour: List[int]) -> List[int]:
+    """Pick the cheaper driving direction of a tour (matrix may be asymmetric)."""
+    reverse = [tour[0]] + tour[:0:-1]
+    return reverse if tour_cost(d, reverse) < tour_cost(d, tour) else tour
+
+
+def christofides_tour(dist_matrix, start_idx: int = 0) -> List[int]:
+    """
+    Build a round-trip tour with the Christofides heuristic (3/2-approximation).
+
+    Driving durations are not symmetric, so the tour is built on the averaged
+    matrix and then walked in whichever direction is cheaper. Tours are
+    memoized on the matrix contents, so re-optimizing an unchanged set of
+    stops skips the matching step entirely.
+
+    Args:
+        dist_matrix: N x N matrix of travel costs (e.g. seconds)
+        start_idx: Index of the anchor stop; the tour starts here
+
+    Returns:
+        List of N stop indices beginning with start_idx (return leg implied)
+    """
+    d = np.asarray(dist_matrix, dtype=float)
+    d = np.where(np.isfinite(d), d, UNREACHABLE_COST)
+    return list(_christofides_cached(d.tobytes(), len(d), start_idx))
+
+
+@functools.lru_cache(maxsize=64)
+def _christofides_cached(matrix_bytes: bytes, n: int, start_idx: int) -> Tuple[int, ...]:
+    """Christofides on a raw float64 matrix buffer (hashable, so results are cached)."""
+    d = np.frombuffer(matrix_bytes, dtype=float).reshape(n, n)
+
+    if n <= 3:
+        order = [start_idx] + [i for i in range(n) if i != start_idx]
+        return tuple(_best_orientation(d, order))
+
+    # networkx takes ~0.1s to import; fetch_place_data imports this module for
+    # DISTANCE_MATRIX_MAX_ELEMENTS, so only pay for it when a tour is solved
+    import networkx as nx
+
+    sym = (d + d.T) / 2
+
+    # Complete graph over all stops
+    G = nx.Graph()
+    for i in range(n):
+        for j in range(i + 1, n):
+            G.add_edge(i, j, weight=sym[i, j])
+
+    # MST + min-weight perfect matching on odd-degree vertices
+    T = nx.minimum_spanning_tree(G)
+    odd = [v for v, deg in T.degree() if deg % 2]
+    M = nx.min_weight_matching(G.subgraph(odd))
+
+    # Union is Eulerian; shortcut repeated vertices
+    H = nx.MultiGraph(T)
+    H.add_edges_from(M)
+
+    tour = []
+    seen = set()
+    for u, _ in nx.eulerian_circuit(H, source=start_idx):
+        if u not in seen:
+            seen.add(u)
+            tour.append(u)
+
+    return tuple(_best_orientation(d, tour))
+
+
+def nearest_neighbor_tour(dist_matrix, start_idx: int = 0) -> List[int]:
+    """Greedy O(N^2) tour: always drive to the closest unvisited stop."""
+    d = np.asarray(dist_matrix, dtype=float)
+    d = np.where(np.isfinite(d), d, UNREACHABLE_COST)
+    n = len(d)
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[start_idx] = False
+    tour = [start_idx]
+
+    for _ in range(n - 1):
+        # Choose among unvisited stops only (unreachable ones cost UNREACHABLE_COST)
+        candidates = np.flatnonzero(unvisited)
+        nxt = int(candidates[np.argmin(d[tour[-1], candidates])])
+        unvisited[nxt] = False
+        tour.append(nxt)
+
+    return tour
+
+
+def two_opt(tour: List[int], dist_matrix, tolerance: float = 1e-8) -> List[int]:
+    """
+    Improve a tour by reversing segments while any reversal shortens it.
+    
+    Uses the symmetric (averaged) matrix for the 4-lookup move delta, then
+    walks the result in the cheaper direction. The first stop stays fixed.
+    Each round scores every (i, j) reversal at once as an N x N NumPy
+    array and applies the best one.
+    
+    Args:
+        tour: Stop indices, starting at the anchor
+        dist_matrix: N x N matrix of travel costs
+        tolerance: Minimum gain to accept a move (avoids float stalls)
+    """
+    d = np.asarray(dist_matrix, dtype=float)
+    d = np.where(np.isfinite(d), d, UNREACHABLE_COST)
+    sym = (d + d.T) / 2
+    order = np.array(tour, dtype=np.intp)
+    n = len(order)
+    if n < 4:
+        return _best_orientation(d, order.tolist())
+    
+    # Valid moves reverse order[i..j] with 1 <= i < j <= n - 1
+    valid = np.triu(np.ones((n, n), dtype=bool), k=1)
+    valid[0, :] = False
+    
+    while True:
+        prev = np.roll(order, 1)
+        nxt = np.roll(order, -1)
+        # delta[i, j] = d(prev_i, c_j) + d(b_i, next_j) - d(prev_i, b_i) - d(c_j, next_j)
+        delta = (
+            sym[prev[:, None], order[None, :]]
+            + sym[order[:, None], nxt[None, :]]
+            - sym[prev, order][:, None]
+            - sym[order, nxt][None, :]
+        )
+        delta[~valid] = 0
+        flat = int(np.argmin(delta))
+        i, j = divmod(flat, n)
+        if delta[i, j] >= -tolerance:
+            break
+        order[i:j + 1] = order[i:j + 1][::-1]
+    
+    return _best_orientation(d, order.tolist())
+
+
+def optimize_tour(dist_matrix, start_idx: int = 0) -> List[int]:
+    """
+    Best-effort round-trip tour: Christofides, falling back to nearest-neighbor,
+    then polished with 2-opt.
+    """
+    try:
+        tour = christofides_tour(dist_matrix, start_idx)
+    except Exception as e:
+        print(f"  ⚠️ Christofides failed ({e}), using nearest-neighbor seed")
+        tour = nearest_neighbor_tour(dist_matrix, start_idx)
+    return two_opt(tour, dist_matrix)
@@ -15,12 +15,22 @@ Usage:
 """
 
 import os
-import json
+import heapq
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import combinations
 from typing import Dict, List, Any, Optional, Tuple
 from dotenv import load_dotenv
 import googlemaps
+import numpy as np
 from math import radians, cos, sin, asin, sqrt
 
+from api_cache import cache_get, cache_put
+from json_io import load_json_file, dump_json_file, EMPTY_SECTION
+from route_solver import distance_matrix_batched, optimize_tour
+
 load_dotenv()
 
 # Configuration
@@ -29,6 +39,88 @@ FOREST_ROUTE_CACHE = 'data/forest_circuit_route.json'
 GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY')
 API_BASE_URL = os.getenv('API_BASE_URL', 'http://127.0.0.1:5001')
 
+EARTH_RADIUS_KM = 6371
+
+# Fallback drive-time estimate when Google Maps is unavailable
+FALLBACK_MIN_PER_KM = 3
+FALLBACK_MIN_TRAVEL = 5
+
+# Standard clusters routed in parallel per itinerary build
+MAX_ROUTE_WORKERS = 4
+
+# Disk-cache namespace for per-place-set duration matrices
+DURATION_MATRIX_CACHE_NAMESPACE = 'scheduler.duration_matrix'
+
+# Disk-cache namespace for point-to-point drive times, keyed on coordinates
+# rounded to TRAVEL_CACHE_PRECISION decimals (~11 m)
+TRAVEL_TIME_CACHE_NAMESPACE = 'scheduler.travel_time'
+TRAVEL_CACHE_PRECISION = 4
+
+# In-process memo size for matrix / travel-time lookups (in front of the disk cache)
+PROCESS_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=PROCESS_CACHE_SIZE)
+def _estimated_travel_minutes(a: Tuple[float, float], b: Tuple[float, float]) -> int:
+    """
+    Straight-line drive estimate (~3 min per km) between two (lat, lng) points.
+    
+    Symmetric, so callers pass the pair sorted and A→B / B→A share one entry.
+    """
+    lat1, lng1, lat2, lng2 = map(radians, (*a, *b))
+    h = sin((lat2 - lat1) / 2)**2 + cos(lat1) * cos(lat2) * sin((lng2 - lng1) / 2)**2
+    dist_km = 2 * EARTH_RADIUS_KM * asin(sqrt(h))
+    return max(FALLBACK_MIN_TRAVEL, int(dist_km * FALLBACK_MIN_PER_KM))
+
+
+@functools.lru_cache(maxsize=PROCESS_CACHE_SIZE)
+def _fetch_duration_matrix(gmaps, place_ids: Tuple[str, ...]) -> np.ndarray:
+    """
+    Read-only duration matrix (seconds, inf if unreachable) for sorted place ids.
+    
+    Memoized per process; misses fall through to the disk cache, then the API.
+    """
+    cached = cache_get(DURATION_MATRIX_CACHE_NAMESPACE, (list(place_ids),))
+    if cached is not None:
+        matrix = np.array(cached, dtype=np.float64)
+        # null -> nan -> inf (unreachable)
+        matrix = np.where(np.isnan(matrix), np.inf, matrix)
+    else:
+        matrix = distance_matrix_batched(gmaps, [f"place_id:{pid}" for pid in place_ids])
+        # JSON has no inf: store unreachable pairs as null
+        cache_put(DURATION_MATRIX_CACHE_NAMESPACE, (list(place_ids),), {}, [
+            [float(v) if np.isfinite(v) else None for v in row] for row in matrix
+        ])
+    
+    # Shared between callers, so never let one mutate it
+    matrix.setflags(write=False)
+    return matrix
+
+
+@functools.lru_cache(maxsize=PROCESS_CACHE_SIZE)
+def _fetch_travel_minutes(gmaps, key: Tuple[float, float, float, float]) -> Optional[int]:
+    """
+    Driving minutes for a rounded (origin_lat, origin_lng, dest_lat, dest_lng),
+    or None if Directions has no route. API errors propagate (and are not memoized).
+    """
+    cached = cache_get(TRAVEL_TIME_CACHE_NAMESPACE, key)
+    if cached is not None:
+        return cached
+    
+    origin_lat, origin_lng, dest_lat, dest_lng = key
+    result = gmaps.directions(
+        origin=(origin_lat, origin_lng),
+        destination=(dest_lat, dest_lng),
+        mode="driving"
+    )
+    if not (result and result[0].get('legs')):
+        return None
+    
+    duration_sec = result[0]['legs'][0]['duration']['value']
+    minutes = max(1, int(duration_sec / 60))
+    cache_put(TRAVEL_TIME_CACHE_NAMESPACE, key, {}, minutes)
+    return minutes
+
 # Pace limits: places per day
 PACE_LIMITS = {
     'slow': 3,
@@ -64,6 +156,139 @@ LUNCH_BREAK_DURATION = 90  # 90 minutes
 CLUSTER_ORDER = ['Town Center', 'Forest Circuit', 'Vattakanal', 'Poombarai']
 
 
+def open_days_mask(place: Dict) -> int:
+    """7-bit mask of weekdays (bit 0 = Sunday, as in Google periods) the place opens on."""
+    periods = ((place.get('logic') or EMPTY_SECTION).get('opening_hours') or EMPTY_SECTION).get('periods')
+    if not periods:
+        return 0x7F  # Assume open 24/7 if no data
+    
+    mask = 0
+    for period in periods:
+        open_day = (period.get('open') or EMPTY_SECTION).get('day')
+        if open_day is not None:
+            mask |= 1 << open_day
+    return mask
+
+
+# Zero-padded "HH" / "MM" strings, so clock formatting is two lookups and a join
+_HH = [f"{h:02d}" for h in range(48)]
+_MM = [f"{m:02d}" for m in range(60)]
+
+
+def format_hhmm(minutes_from_midnight) -> str:
+    """Format minutes from midnight as "HH:MM" (hours may run past 23)."""
+    hours, minutes = divmod(minutes_from_midnight, 60)
+    hours, minutes = int(hours), int(minutes)
+    if 0 <= hours < len(_HH):
+        return f"{_HH[hours]}:{_MM[minutes]}"
+    return f"{hours:02d}:{minutes:02d}"
+
+
+def plan_day_times(
+    stay_minutes: List[int],
+    travel_minutes: List[int],
+    forced: List[bool],
+    start_minute: int,
+    end_minute: int
+) -> Tuple[List[Optional[Tuple[int, int, bool, bool]]], int]:
+    """
+    Lay one day's stops on a timeline, inserting lunch and dropping stops that overrun.
+    
+    Pure arithmetic over flat lists (no place dicts), all in minutes from midnight.
+    
+    Args:
+        stay_minutes: Time spent at each stop
+        travel_minutes: Drive from each stop to the next
+        forced: Stops the user insisted on (kept even if they overrun)
+        start_minute: Day start
+        end_minute: Target day end
+    
+    Returns:
+        (slots, end_time): slots[i] is None for a dropped stop, otherwise
+        (arrival, departure, has_lunch_before, runs_late)
+    """
+    current_time = start_minute
+    lunch_inserted = False
+    lunch_from = LUNCH_BREAK_TIME * 60 - 30
+    slots = []
+    
+    for time_at_place, travel_after, is_user_forced in zip(stay_minutes, travel_minutes, forced):
+        # Check if we need lunch break
+        needs_lunch = not lunch_inserted and current_time >= lunch_from
+        lunch_addition = LUNCH_BREAK_DURATION if needs_lunch else 0
+        
+        # Check if this place would finish past the end time
+        exceeds_end_time = current_time + lunch_addition + time_at_place + travel_after > end_minute
+        if exceeds_end_time and not is_user_forced:
+            slots.append(None)
+            continue
+        
+        if needs_lunch:
+            current_time += LUNCH_BREAK_DURATION
+            lunch_inserted = True
+        
+        departure_time = current_time + time_at_place
+        slots.append((current_time, departure_time, needs_lunch, exceeds_end_time))
+        
+        # Move current time forward
+        current_time = departure_time + travel_after
+    
+    return slots, current_time
+
+
+@dataclass(slots=True, frozen=True)
+class PlaceView:
+    """The fields of a place that itinerary building reads, flattened once at load."""
+    id: str
+    name: str
+    google_place_id: str
+    cluster_zone: Optional[str]
+    nearest_cluster: Optional[str]
+    lat: Optional[float]
+    lng: Optional[float]
+    image_url: str
+    tags3: List[str]
+    rating: Optional[float]
+    review_count: int
+    popularity_rank: int
+    avg_time_minutes: int
+    tips: List[str]
+    short_summary: str
+    best_time_text: str
+    difficulty: str
+    itinerary_include: bool
+    open_days_mask: int
+    
+    @classmethod
+    def from_dict(cls, place: Dict) -> 'PlaceView':
+        location = place.get('location') or EMPTY_SECTION
+        content = place.get('content') or EMPTY_SECTION
+        stats = place.get('stats') or EMPTY_SECTION
+        logic = place.get('logic') or EMPTY_SECTION
+        photo_ref = content.get('photo_reference')
+        return cls(
+            id=place['id'],
+            name=place.get('name', place['id']),
+            google_place_id=place.get('google_place_id', ''),
+            cluster_zone=location.get('cluster_zone'),
+            nearest_cluster=location.get('nearest_cluster'),
+            lat=location.get('lat'),
+            lng=location.get('lng'),
+            image_url=f"{API_BASE_URL}/api/photo/{photo_ref}" if photo_ref else '',
+            tags3=content.get('tags', [])[:3],
+            rating=stats.get('rating'),
+            review_count=stats.get('review_count', 0),
+            popularity_rank=stats.get('popularity_rank', 999),
+            avg_time_minutes=logic.get('avg_time_spent_minutes', 60),
+            tips=content.get('tips', []),
+            short_summary=content.get('short_summary', ''),
+            best_time_text=content.get('best_time_text', ''),
+            difficulty=logic.get('difficulty', 'Easy'),
+            itinerary_include=logic.get('itinerary_include', True) is not False,
+            open_days_mask=open_days_mask(place)
+        )
+
+
 class ItineraryScheduler:
     """
     Builds optimized day-wise itineraries.
@@ -79,24 +304,56 @@ class ItineraryScheduler:
         """Initialize the scheduler."""
         self.gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY) if GOOGLE_MAPS_API_KEY else None
         self.forest_route = self._load_forest_route()
+        self._forest_route_ids = frozenset(item['id'] for item in self.forest_route)
         self.places_data = self._load_places()
+        self.place_views = {pid: PlaceView.from_dict(p) for pid, p in self.places_data.items()}
+        self._places_by_cluster = self._index_places_by_cluster(self.place_views)
+        self._pid_to_idx, self._lat, self._lng = self._build_coordinate_columns(self.place_views)
         print("✅ ItineraryScheduler initialized")
     
     def _load_places(self) -> Dict[str, Dict]:
         """Load places indexed by ID."""
         try:
-            with open(PLACES_PATH, 'r') as f:
-                data = json.load(f)
+            data = load_json_file(PLACES_PATH)
             return {p['id']: p for p in data.get('places', [])}
         except Exception as e:
             print(f"⚠️ Could not load places: {e}")
             return {}
     
+    def _build_coordinate_columns(
+        self,
+        place_views: Dict[str, PlaceView]
+    ) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+        """Lay place coordinates out as two float64 columns (missing = 0) plus an id -> row index."""
+        n = len(place_views)
+        pid_to_idx = {pid: i for i, pid in enumerate(place_views)}
+        lat = np.fromiter((v.lat or 0 for v in place_views.values()), dtype=np.float64, count=n)
+        lng = np.fromiter((v.lng or 0 for v in place_views.values()), dtype=np.float64, count=n)
+        return pid_to_idx, lat, lng
+    
+    def _index_places_by_cluster(
+        self,
+        place_views: Dict[str, PlaceView]
+    ) -> Dict[str, List[Tuple[int, PlaceView]]]:
+        """
+        Group places by cluster_zone, best first: rating (desc) then review count (desc).
+        
+        Each entry carries its global rank so per-cluster lists can be merged in order.
+        """
+        ranked = sorted(
+            place_views.values(),
+            key=lambda v: (v.rating or 0, v.review_count or 0),
+            reverse=True
+        )
+        by_cluster = {}
+        for rank, view in enumerate(ranked):
+            by_cluster.setdefault(view.cluster_zone, []).append((rank, view))
+        return by_cluster
+    
     def _load_forest_route(self) -> List[Dict]:
         """Load cached Forest Circuit route, or return default."""
         try:
-            with open(FOREST_ROUTE_CACHE, 'r') as f:
-                return json.load(f)
+            return load_json_file(FOREST_ROUTE_CACHE)
         except FileNotFoundError:
             # Default hardcoded route
             return [
@@ -114,7 +371,7 @@ class ItineraryScheduler:
         
         Logic:
         1. Get all Forest Circuit places from JSON
-        2. Call Google Maps: Bus Stand → [all places] → Bus Stand
+        2. Fetch one duration matrix for Bus Stand + places, solve the loop locally
         3. Remove Bus Stand from ends and cache result
         """
         if not self.gmaps:
@@ -123,8 +380,8 @@ class ItineraryScheduler:
         
         # Find all Forest Circuit places
         forest_places = [
-            p for p in self.places_data.values()
-            if p.get('location', {}).get('cluster_zone') == 'Forest Circuit'
+            p for pid, p in self.places_data.items()
+            if self.place_views[pid].cluster_zone == 'Forest Circuit'
         ]
         
         if len(forest_places) < 2:
@@ -138,57 +395,55 @@ class ItineraryScheduler:
             return self.forest_route
         
         try:
-            # Build waypoints
-            waypoints = [f"place_id:{p['google_place_id']}" for p in forest_places]
-            origin = f"place_id:{bus_stand['google_place_id']}"
-            
-            print(f"🔄 Rebuilding Forest Circuit route ({len(waypoints)} places)...")
-            
-            result = self.gmaps.directions(
-                origin=origin,
-                destination=origin,
-                waypoints=waypoints,
-                optimize_waypoints=True,
-                mode='driving'
-            )
+            print(f"🔄 Rebuilding Forest Circuit route ({len(forest_places)} places)...")
             
-            if not result:
-                print("⚠️ No route found, using default")
-                return self.forest_route
+            # Bus Stand → [all places] → Bus Stand, ordered locally from one duration matrix
+            stops = [bus_stand] + forest_places
+            matrix = self._get_duration_matrix(stops)
+            tour = optimize_tour(matrix, start_idx=0)
             
-            route = result[0]
-            waypoint_order = route.get('waypoint_order', [])
-            legs = route.get('legs', [])
-            
-            # Build optimized route (skip first and last leg which are bus stand)
+            # Drop the Bus Stand; each place records the drive to the next one
             optimized = []
-            for i, wp_idx in enumerate(waypoint_order):
-                place = forest_places[wp_idx]
-                travel_time = 0
-                if i + 1 < len(legs) - 1:  # Not the last leg back to bus stand
-                    travel_time = round(legs[i + 1]['duration']['value'] / 60)
-                
+            for i, idx in enumerate(tour[1:], start=1):
+                next_idx = tour[i + 1] if i + 1 < len(tour) else None
                 optimized.append({
-                    "id": place['id'],
-                    "travel_to_next_min": travel_time
+                    "id": stops[idx]['id'],
+                    "travel_to_next_min": self._matrix_minutes(matrix, idx, next_idx) if next_idx is not None else 0
                 })
             
-            # Last place has 0 travel time (end of forest loop)
-            if optimized:
-                optimized[-1]['travel_to_next_min'] = 0
-            
             # Cache the route
-            with open(FOREST_ROUTE_CACHE, 'w') as f:
-                json.dump(optimized, f, indent=2)
+            dump_json_file(FOREST_ROUTE_CACHE, optimized)
             
             print(f"✅ Forest Circuit route rebuilt: {[p['id'].split('-')[0] for p in optimized]}")
             self.forest_route = optimized
+            self._forest_route_ids = frozenset(item['id'] for item in optimized)
             return optimized
             
         except Exception as e:
             print(f"❌ Error rebuilding Forest route: {e}")
             return self.forest_route
     
+    def _get_duration_matrix(self, places: List[Dict]) -> np.ndarray:
+        """
+        N x N driving durations (seconds) between places, in the given order.
+        
+        The matrix is fetched once per place set (one Distance Matrix pass) and
+        kept in memory and in the disk cache, so repeat itineraries over the
+        same places need no API call at all.
+        """
+        place_ids = [p['google_place_id'] for p in places]
+        key = tuple(sorted(set(place_ids)))
+        canonical = _fetch_duration_matrix(self.gmaps, key)
+        
+        pos = {pid: i for i, pid in enumerate(key)}
+        order = [pos[pid] for pid in place_ids]
+        return canonical[np.ix_(order, order)]
+    
+    def _matrix_minutes(self, matrix: np.ndarray, i: int, j: int) -> int:
+        """Whole minutes for one matrix leg (0 if unreachable)."""
+        seconds = matrix[i, j]
+        return round(seconds / 60) if np.isfinite(seconds) else 0
+    
     def _get_forest_route_for_selection(self, selected_ids: List[str]) -> List[Dict]:
         """
         Get Forest Circuit route filtered by selected places.
@@ -215,30 +470,82 @@ class ItineraryScheduler:
         return result
     
     def _haversine(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-        """Calculate distance between two points in km."""
+        """Calculate distance between two points in km (scalar math beats NumPy for one pair)."""
         lat1, lng1, lat2, lng2 = map(radians, [lat1, lng1, lat2, lng2])
         dlat = lat2 - lat1
         dlng = lng2 - lng1
         a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlng/2)**2
-        return 2 * 6371 * asin(sqrt(a))
+        return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
+    
+    def _haversine_vec(self, lat1: float, lng1: float, lats2, lngs2) -> np.ndarray:
+        """Distances in km from one point to many (one NumPy pass)."""
+        return self._pairwise_haversine([lat1], [lng1], lats2, lngs2)[0]
+    
+    def _pairwise_haversine(self, lats_a, lngs_a, lats_b, lngs_b) -> np.ndarray:
+        """(len(a), len(b)) matrix of distances in km between two sets of points."""
+        lat_a = np.radians(np.asarray(lats_a, dtype=np.float64))[:, None]
+        lng_a = np.radians(np.asarray(lngs_a, dtype=np.float64))[:, None]
+        lat_b = np.radians(np.asarray(lats_b, dtype=np.float64))[None, :]
+        lng_b = np.radians(np.asarray(lngs_b, dtype=np.float64))[None, :]
+        a = np.sin((lat_b - lat_a) / 2)**2 + np.cos(lat_a) * np.cos(lat_b) * np.sin((lng_b - lng_a) / 2)**2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+    
+    def _get_coordinates(self, place_id: str) -> Tuple[float, float]:
+        """(lat, lng) of a place from the coordinate columns; (0, 0) if unknown."""
+        idx = self._pid_to_idx.get(place_id)
+        if idx is None:
+            return (0, 0)
+        return (float(self._lat[idx]), float(self._lng[idx]))
+    
+    def _place_indices(self, places: List[Dict]) -> np.ndarray:
+        """Rows of the coordinate columns for a list of places."""
+        return np.fromiter((self._pid_to_idx[p['id']] for p in places), dtype=np.intp, count=len(places))
     
     def _get_cluster_centroid(self, places: List[Dict]) -> Tuple[float, float]:
         """Calculate average lat/lng for a cluster."""
         if not places:
             return (0, 0)
-        lats = [p.get('location', {}).get('lat', 0) for p in places]
-        lngs = [p.get('location', {}).get('lng', 0) for p in places]
-        return (sum(lats) / len(lats), sum(lngs) / len(lngs))
+        idxs = self._place_indices(places)
+        return (float(self._lat[idxs].mean()), float(self._lng[idxs].mean()))
+    
+    def _build_enriched(
+        self,
+        view: PlaceView,
+        name: str,
+        cluster: str,
+        travel_to_next_min: int,
+        is_forest: bool
+    ) -> Dict[str, Any]:
+        """One itinerary stop as sent to the client (same key order for every branch)."""
+        return {
+            'id': view.id,
+            'name': name,
+            'cluster': cluster,
+            'lat': view.lat,
+            'lng': view.lng,
+            'image_url': view.image_url,
+            'tags': view.tags3,
+            'rating': view.rating,
+            'review_count': view.review_count,
+            'avg_time_minutes': view.avg_time_minutes,
+            'tips': view.tips,
+            'short_summary': view.short_summary,
+            'best_time_text': view.best_time_text,
+            'difficulty': view.difficulty,
+            'travel_to_next_min': travel_to_next_min,
+            'is_forest_circuit': is_forest
+        }
     
     def _find_anchor(self, places: List[Dict]) -> Optional[Dict]:
         """Find anchor place: Hard difficulty first, then highest popularity."""
         # Try to find a Hard difficulty place
-        hard_places = [p for p in places if p.get('logic', {}).get('difficulty') == 'Hard']
+        views = self.place_views
+        hard_places = [p for p in places if views[p['id']].difficulty == 'Hard']
         if hard_places:
-            return sorted(hard_places, key=lambda p: p.get('stats', {}).get('popularity_rank', 999))[0]
+            return min(hard_places, key=lambda p: views[p['id']].popularity_rank)
         
         # Fallback: highest popularity
-        return sorted(places, key=lambda p: p.get('stats', {}).get('popularity_rank', 999))[0] if places else None
+        return min(places, key=lambda p: views[p['id']].popularity_rank) if places else None
     
     def _optimize_cluster_route(
         self,
@@ -274,53 +581,27 @@ class ItineraryScheduler:
             return result
         
         try:
-            # Build waypoints
-            waypoints = [f"place_id:{p['google_place_id']}" for p in other_places]
-            anchor_id = f"place_id:{anchor['google_place_id']}"
-            
-            # Route: Anchor → waypoints → Anchor (round trip)
-            result_route = self.gmaps.directions(
-                origin=anchor_id,
-                destination=anchor_id,
-                waypoints=waypoints,
-                optimize_waypoints=True,
-                mode='driving'
-            )
-            
-            if not result_route:
-                # Fallback: unoptimized order
-                result = [{'id': anchor['id'], 'name': anchor['name'], 'travel_to_next_min': 0}]
-                for p in other_places:
-                    result.append({'id': p['id'], 'name': p['name'], 'travel_to_next_min': 0})
-                return result
-            
-            route = result_route[0]
-            waypoint_order = route.get('waypoint_order', [])
-            legs = route.get('legs', [])
-            
-            # Build result: Anchor first
-            result = [{
-                'id': anchor['id'],
-                'name': anchor['name'],
-                'travel_to_next_min': round(legs[0]['duration']['value'] / 60) if legs else 0
-            }]
+            # Route: Anchor → waypoints → Anchor (round trip), solved on one duration matrix
+            stops = [anchor] + other_places
+            try:
+                matrix = self._get_duration_matrix(stops)
+            except Exception as e:
+                # Still order the stops sensibly, from straight-line estimates
+                print(f"⚠️ Distance Matrix failed ({e}), using straight-line estimates")
+                matrix = self._estimated_duration_matrix(stops)
+            tour = optimize_tour(matrix, start_idx=0)
             
-            # Add waypoints in optimized order
-            for i, wp_idx in enumerate(waypoint_order):
-                place = other_places[wp_idx]
-                travel_time = 0
-                if i + 1 < len(legs):
-                    travel_time = round(legs[i + 1]['duration']['value'] / 60)
+            # Anchor first; the last place's travel time is back to the anchor
+            # (we'll use this for return to hotel)
+            result = []
+            for i, idx in enumerate(tour):
+                place = stops[idx]
                 result.append({
                     'id': place['id'],
                     'name': place['name'],
-                    'travel_to_next_min': travel_time
+                    'travel_to_next_min': self._matrix_minutes(matrix, idx, tour[(i + 1) % len(tour)])
                 })
             
-            # Last place travel time is back to start (we'll use this for return to hotel)
-            if result:
-                result[-1]['travel_to_next_min'] = round(legs[-1]['duration']['value'] / 60) if legs else 0
-            
             return result
             
         except Exception as e:
@@ -335,11 +616,12 @@ class ItineraryScheduler:
         clusters = {c: [] for c in CLUSTER_ORDER}
         
         for place in places:
-            cluster = place.get('location', {}).get('cluster_zone', 'Town Center')
+            view = self.place_views[place['id']]
+            cluster = view.cluster_zone or 'Town Center'
             
             if cluster == 'Outskirts':
                 # Absorb into nearest cluster
-                nearest = place.get('location', {}).get('nearest_cluster', 'Town Center')
+                nearest = view.nearest_cluster or 'Town Center'
                 if nearest in clusters:
                     clusters[nearest].append(place)
                 else:
@@ -362,26 +644,37 @@ class ItineraryScheduler:
         This balances place counts across days better than geographic merging.
         """
         active_clusters = {k: v for k, v in clusters.items() if v}
+        if len(active_clusters) <= max(num_days, 1):
+            return active_clusters
+        
+        # Insertion sequence per cluster: ties go to the earliest pair, as in dict order
+        seq = {name: i for i, name in enumerate(active_clusters)}
+        sizes = {name: len(places) for name, places in active_clusters.items()}
+        
+        # Min-heap of (combined size, seq1, seq2, c1, c2); stale pairs are skipped on pop
+        heap = [
+            (sizes[c1] + sizes[c2], seq[c1], seq[c2], c1, c2)
+            for c1, c2 in combinations(active_clusters, 2)
+        ]
+        heapq.heapify(heap)
+        next_seq = len(seq)
         
         while len(active_clusters) > num_days and len(active_clusters) > 1:
-            # Find two clusters with the fewest combined places
-            cluster_names = list(active_clusters.keys())
-            min_combined = float('inf')
-            merge_pair = (cluster_names[0], cluster_names[1])
-            
-            for i, c1 in enumerate(cluster_names):
-                for c2 in cluster_names[i+1:]:
-                    combined_count = len(active_clusters[c1]) + len(active_clusters[c2])
-                    if combined_count < min_combined:
-                        min_combined = combined_count
-                        merge_pair = (c1, c2)
+            _, _, _, c1, c2 = heapq.heappop(heap)
+            if c1 not in active_clusters or c2 not in active_clusters:
+                continue
             
             # Merge c2 into c1
-            c1, c2 = merge_pair
-            print(f"📦 Merging clusters for balance: {c1} ({len(active_clusters[c1])} places) + {c2} ({len(active_clusters[c2])} places)")
-            active_clusters[f"{c1} + {c2}"] = active_clusters[c1] + active_clusters[c2]
-            del active_clusters[c1]
-            del active_clusters[c2]
+            print(f"📦 Merging clusters for balance: {c1} ({sizes[c1]} places) + {c2} ({sizes[c2]} places)")
+            merged_name = f"{c1} + {c2}"
+            active_clusters[merged_name] = active_clusters.pop(c1) + active_clusters.pop(c2)
+            sizes[merged_name] = sizes.pop(c1) + sizes.pop(c2)
+            seq[merged_name] = next_seq
+            next_seq += 1
+            
+            for other in active_clusters:
+                if other != merged_name:
+                    heapq.heappush(heap, (sizes[other] + sizes[merged_name], seq[other], seq[merged_name], other, merged_name))
         
         return active_clusters
 
@@ -398,31 +691,81 @@ class ItineraryScheduler:
         selected_set = set(selected_ids)
         candidates = []
         
-        for pid, place in self.places_data.items():
-            if pid in selected_set:
+        # Suggest only places in the same clusters we are visiting
+        # This ensures they are "on the way" or nearby.
+        # Each cluster list is pre-sorted by rating then review count, so merging
+        # them on the global rank yields candidates best-first.
+        streams = [self._places_by_cluster.get(c, []) for c in visited_clusters]
+        for _, view in heapq.merge(*streams):
+            if view.id in selected_set:
                 continue
-            
-            # Suggest only places in the same clusters we are visiting
-            # This ensures they are "on the way" or nearby
-            p_cluster = place.get('location', {}).get('cluster_zone')
-            if p_cluster in visited_clusters:
-                content = place.get('content', {})
-                photo_ref = content.get('photo_reference')
-                candidates.append({
-                    'id': pid,
-                    'name': place.get('name'),
-                    'cluster': p_cluster,
-                    'image_url': f"{API_BASE_URL}/api/photo/{photo_ref}" if photo_ref else '',
-                    'rating': place.get('stats', {}).get('rating', 0),
-                    'review_count': place.get('stats', {}).get('review_count', 0),
-                    'avg_time_minutes': place.get('logic', {}).get('avg_time_spent_minutes', 60),
-                    'difficulty': place.get('logic', {}).get('difficulty', 'Easy')
-                })
+            candidates.append({
+                'id': view.id,
+                'name': view.name,
+                'cluster': view.cluster_zone,
+                'image_url': view.image_url,
+                'rating': view.rating,
+                'review_count': view.review_count,
+                'avg_time_minutes': view.avg_time_minutes,
+                'difficulty': view.difficulty
+            })
+            if len(candidates) == 5:
+                break
+        
+        return candidates
+    
+    def _best_cluster_order(
+        self,
+        clusters: Dict[str, List[Dict]],
+        start_day_idx: int
+    ) -> Tuple[List[str], int]:
+        """
+        Order clusters over consecutive days so the fewest places are closed.
+        
+        Bitmask DP over which clusters are already scheduled: O(2^N * N) instead
+        of trying all N! orders. Ties resolve to the same order a permutation
+        search over the dict order would pick.
+        
+        Returns:
+            (cluster names in visiting order, number of closed-place visits)
+        """
+        cluster_names = list(clusters.keys())
+        n = len(cluster_names)
+        
+        # closed[c][d] = places in cluster c closed on weekday d
+        closed = []
+        for name in cluster_names:
+            masks = [self.place_views[p['id']].open_days_mask for p in clusters[name]]
+            closed.append([sum(1 for m in masks if not (m >> d) & 1) for d in range(7)])
+        
+        # Nothing closed in the current order: it is already optimal (and the first
+        # permutation the tie-break would pick), so skip the DP
+        if not any(closed[c][(start_day_idx + c) % 7] for c in range(n)):
+            return cluster_names, 0
+        
+        # best[mask] = fewest closed visits for the clusters not yet in mask,
+        # when the next one lands on day popcount(mask)
+        full = (1 << n) - 1
+        best = [0] * (full + 1)
+        for mask in range(full - 1, -1, -1):
+            weekday = (start_day_idx + mask.bit_count()) % 7
+            best[mask] = min(
+                closed[c][weekday] + best[mask | (1 << c)]
+                for c in range(n) if not (mask >> c) & 1
+            )
         
-        # Sort by rating (desc) then review count (desc)
-        candidates.sort(key=lambda x: (x.get('rating', 0) or 0, x.get('review_count', 0) or 0), reverse=True)
+        # Walk forward, taking the first cluster that stays on an optimal path
+        order = []
+        mask = 0
+        while mask != full:
+            weekday = (start_day_idx + mask.bit_count()) % 7
+            for c in range(n):
+                if not (mask >> c) & 1 and closed[c][weekday] + best[mask | (1 << c)] == best[mask]:
+                    order.append(cluster_names[c])
+                    mask |= 1 << c
+                    break
         
-        return candidates[:5]
+        return order, best[0]
     
     def _estimate_day_duration(self, places: List[Dict]) -> int:
         """Estimate total duration for a list of places in minutes."""
@@ -430,7 +773,7 @@ class ItineraryScheduler:
         for p in places:
             # Time at place
             if isinstance(p, dict):
-                total += p.get('avg_time_minutes', 60) if 'avg_time_minutes' in p else p.get('logic', {}).get('avg_time_spent_minutes', 60)
+                total += p['avg_time_minutes'] if 'avg_time_minutes' in p else (p.get('logic') or EMPTY_SECTION).get('avg_time_spent_minutes', 60)
                 total += p.get('travel_to_next_min', 10)
             else:
                 total += 70  # Default estimate
@@ -514,27 +857,42 @@ class ItineraryScheduler:
         """
         Get driving time in minutes between two coordinates.
         Uses Google Maps Directions API, falls back to haversine estimate.
+        API results are cached (in memory and on disk) per rounded coordinate
+        pair; estimates are not, so a later successful call is never shadowed
+        by one.
         """
         if not self.gmaps:
             # Fallback: estimate ~3 min per km
-            dist_km = self._haversine(origin_lat, origin_lng, dest_lat, dest_lng)
-            return max(5, int(dist_km * 3))
+            return _estimated_travel_minutes(*sorted([(origin_lat, origin_lng), (dest_lat, dest_lng)]))
         
+        key = tuple(round(v, TRAVEL_CACHE_PRECISION) for v in (origin_lat, origin_lng, dest_lat, dest_lng))
         try:
-            result = self.gmaps.directions(
-                origin=(origin_lat, origin_lng),
-                destination=(dest_lat, dest_lng),
-                mode="driving"
-            )
-            if result and result[0].get('legs'):
-                duration_sec = result[0]['legs'][0]['duration']['value']
-                return max(1, int(duration_sec / 60))
+            minutes = _fetch_travel_minutes(self.gmaps, key)
+            if minutes is not None:
+                return minutes
         except Exception as e:
             print(f"⚠️ Google Maps directions failed: {e}")
         
         # Fallback
-        dist_km = self._haversine(origin_lat, origin_lng, dest_lat, dest_lng)
-        return max(5, int(dist_km * 3))
+        return _estimated_travel_minutes(*sorted([(origin_lat, origin_lng), (dest_lat, dest_lng)]))
+    
+    def _build_distance_matrix(self, lats, lngs) -> np.ndarray:
+        """Pairwise haversine distances (km) among a set of points, in one broadcast pass."""
+        return self._pairwise_haversine(lats, lngs, lats, lngs)
+    
+    def _estimated_duration_matrix(self, places: List[Dict]) -> np.ndarray:
+        """N x N drive seconds from straight-line distance, by the same rule as _get_travel_time's fallback."""
+        idxs = self._place_indices(places)
+        dist_km = self._build_distance_matrix(self._lat[idxs], self._lng[idxs])
+        minutes = np.maximum(FALLBACK_MIN_TRAVEL, (dist_km * FALLBACK_MIN_PER_KM).astype(int))
+        np.fill_diagonal(minutes, 0)
+        return minutes * 60.0
+    
+    def _estimate_travel_times(self, lat: float, lng: float, lats, lngs) -> List[int]:
+        """Haversine drive-time estimates (minutes) from one point to many, as in _get_travel_time's fallback."""
+        dist_km = self._haversine_vec(lat, lng, lats, lngs)
+        minutes = np.maximum(FALLBACK_MIN_TRAVEL, (dist_km * FALLBACK_MIN_PER_KM).astype(int))
+        return minutes.tolist()
 
 
     def build_itinerary(
@@ -575,7 +933,7 @@ class ItineraryScheduler:
         # Filter out places not meant for itinerary (restaurants, services, etc.)
         selected_places = [
             p for p in selected_places 
-            if p.get('logic', {}).get('itinerary_include', True) is not False
+            if self.place_views[p['id']].itinerary_include
         ]
         
         if not selected_places:
@@ -592,7 +950,6 @@ class ItineraryScheduler:
         start_date_str = user_config.get('start_date')
         if start_date_str:
             try:
-                from datetime import datetime
                 start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00'))
                 start_day_idx = int(start_date.strftime('%w')) # 0=Sun, 6=Sat
                 
@@ -600,40 +957,7 @@ class ItineraryScheduler:
                 # We need to assign clusters to days (0, 1, 2...) such that closed places are minimized.
                 # Simple greedy approach or permutation if days are small (usually 2-3).
                 
-                cluster_names = list(clusters.keys())
-                import itertools
-                
-                best_perm = cluster_names
-                min_closed = float('inf')
-                
-                # Check all permutations of clusters against days
-                for perm in itertools.permutations(cluster_names):
-                    closed_count = 0
-                    current_day_idx = start_day_idx
-                    
-                    for cluster_name in perm:
-                        cluster_places = clusters[cluster_name]
-                        # Check each place against current_day_idx
-                        for p in cluster_places:
-                            # 0=Sunday in Google Maps API opening_hours
-                            periods = p.get('logic', {}).get('opening_hours', {}).get('periods', [])
-                            if not periods: continue # Assume open 24/7 if no data
-                            
-                            is_open = False
-                            for period in periods:
-                                open_day = period.get('open', {}).get('day')
-                                if open_day == current_day_idx:
-                                    is_open = True
-                                    break
-                            
-                            if not is_open:
-                                closed_count += 1
-                        
-                        current_day_idx = (current_day_idx + 1) % 7
-                    
-                    if closed_count < min_closed:
-                        min_closed = closed_count
-                        best_perm = perm
+                best_perm, min_closed = self._best_cluster_order(clusters, start_day_idx)
                 
                 # Reorder clusters dict
                 new_clusters = {name: clusters[name] for name in best_perm}
@@ -643,6 +967,18 @@ class ItineraryScheduler:
             except Exception as e:
                 print(f"⚠️ Day optimization failed: {e}")
 
+        # Route every standard cluster up front (Forest Circuit keeps its fixed
+        # loop). There are at most three, so MAX_ROUTE_WORKERS gives each a worker.
+        pending = [
+            (name, places) for name, places in clusters.items()
+            if places and 'Forest Circuit' not in name
+        ]
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_ROUTE_WORKERS, len(pending)))) as executor:
+            cluster_routes = dict(zip(
+                (name for name, _ in pending),
+                executor.map(lambda item: self._optimize_cluster_route(item[1], hotel_cluster), pending)
+            ))
+        
         # Build itinerary by day
         days = []
         day_num = 1
@@ -657,7 +993,7 @@ class ItineraryScheduler:
             
             if 'Forest Circuit' in cluster_name:
                 # Separate Forest Circuit places from other places in merged cluster
-                forest_route_ids = {item['id'] for item in self.forest_route}
+                forest_route_ids = self._forest_route_ids
                 forest_places = [p for p in day_places if p['id'] in forest_route_ids]
                 other_places = [p for p in day_places if p['id'] not in forest_route_ids]
                 
@@ -669,55 +1005,21 @@ class ItineraryScheduler:
                 
                 # Enrich Forest Circuit places
                 enriched = []
+                total_drive = 0
                 for item in route:
-                    place = self.places_data.get(item['id'], {})
-                    content = place.get('content', {})
-                    photo_ref = content.get('photo_reference')
-                    loc = place.get('location', {})
-                    enriched.append({
-                        'id': item['id'],
-                        'name': place.get('name', item['id']),
-                        'cluster': 'Forest Circuit',
-                        'lat': loc.get('lat'),
-                        'lng': loc.get('lng'),
-                        'image_url': f"{API_BASE_URL}/api/photo/{photo_ref}" if photo_ref else '',
-                        'tags': content.get('tags', [])[:3],
-                        'rating': place.get('stats', {}).get('rating'),
-                        'review_count': place.get('stats', {}).get('review_count', 0),
-                        'avg_time_minutes': place.get('logic', {}).get('avg_time_spent_minutes', 60),
-                        'tips': content.get('tips', []),
-                        'short_summary': content.get('short_summary', ''),
-                        'best_time_text': content.get('best_time_text', ''),
-                        'difficulty': place.get('logic', {}).get('difficulty', 'Easy'),
-                        'travel_to_next_min': item['travel_to_next_min'],
-                        'is_forest_circuit': True
-                    })
+                    view = self.place_views[item['id']]
+                    enriched.append(self._build_enriched(
+                        view, view.name, 'Forest Circuit', item['travel_to_next_min'], True
+                    ))
+                    total_drive += item['travel_to_next_min']
                 
                 # Add non-Forest places (e.g., Vattakanal) at the end
                 for place in other_places:
-                    content = place.get('content', {})
-                    photo_ref = content.get('photo_reference')
-                    loc = place.get('location', {})
-                    enriched.append({
-                        'id': place['id'],
-                        'name': place.get('name'),
-                        'cluster': place.get('location', {}).get('cluster_zone', cluster_name),
-                        'lat': loc.get('lat'),
-                        'lng': loc.get('lng'),
-                        'image_url': f"{API_BASE_URL}/api/photo/{photo_ref}" if photo_ref else '',
-                        'tags': content.get('tags', [])[:3],
-                        'rating': place.get('stats', {}).get('rating'),
-                        'review_count': place.get('stats', {}).get('review_count', 0),
-                        'avg_time_minutes': place.get('logic', {}).get('avg_time_spent_minutes', 60),
-                        'tips': content.get('tips', []),
-                        'short_summary': content.get('short_summary', ''),
-                        'best_time_text': content.get('best_time_text', ''),
-                        'difficulty': place.get('logic', {}).get('difficulty', 'Easy'),
-                        'travel_to_next_min': 10,
-                        'is_forest_circuit': False
-                    })
-                
-                total_drive = sum(p['travel_to_next_min'] for p in enriched)
+                    view = self.place_views[place['id']]
+                    enriched.append(self._build_enriched(
+                        view, view.name, view.cluster_zone or cluster_name, 10, False
+                    ))
+                total_drive += 10 * len(other_places)
                 
                 days.append({
                     'day': day_num,
@@ -728,35 +1030,18 @@ class ItineraryScheduler:
                 })
             else:
                 # Standard cluster optimization
-                route = self._optimize_cluster_route(day_places, hotel_cluster)
+                route = cluster_routes[cluster_name]
                 
                 # Enrich with place data
                 enriched = []
+                total_drive = 0
                 for item in route:
-                    place = self.places_data.get(item['id'], {})
-                    content = place.get('content', {})
-                    photo_ref = content.get('photo_reference')
-                    loc = place.get('location', {})
-                    enriched.append({
-                        'id': item['id'],
-                        'name': item.get('name', place.get('name', item['id'])),
-                        'cluster': cluster_name,
-                        'lat': loc.get('lat'),
-                        'lng': loc.get('lng'),
-                        'image_url': f"{API_BASE_URL}/api/photo/{photo_ref}" if photo_ref else '',
-                        'tags': content.get('tags', [])[:3],
-                        'rating': place.get('stats', {}).get('rating'),
-                        'review_count': place.get('stats', {}).get('review_count', 0),
-                        'avg_time_minutes': place.get('logic', {}).get('avg_time_spent_minutes', 60),
-                        'tips': content.get('tips', []),
-                        'short_summary': content.get('short_summary', ''),
-                        'best_time_text': content.get('best_time_text', ''),
-                        'difficulty': place.get('logic', {}).get('difficulty', 'Easy'),
-                        'travel_to_next_min': item.get('travel_to_next_min', 0),
-                        'is_forest_circuit': False
-                    })
-                
-                total_drive = sum(p['travel_to_next_min'] for p in enriched)
+                    view = self.place_views[item['id']]
+                    travel = item.get('travel_to_next_min', 0)
+                    enriched.append(self._build_enriched(
+                        view, item.get('name', view.name), cluster_name, travel, False
+                    ))
+                    total_drive += travel
                 
                 days.append({
                     'day': day_num,
@@ -783,71 +1068,56 @@ class ItineraryScheduler:
         # Track removed places
         removed_places = []
         
+        # Same for every day
+        day_start_text = format_hhmm(start_hour * 60)
+        day_end_text = format_hhmm(end_hour * 60)
+        
         # Calculate scheduled times for each place and enforce end time
         for day in days:
-            current_time = start_hour * 60  # Convert to minutes from midnight
-            lunch_inserted = False
-            
             # Track places to keep and places to overflow
             places_to_keep = []
             overflow_places = []
+            kept_drive = 0
             
-            for place in day['places']:
-                # Estimate time needed for this place
-                time_at_place = place.get('avg_time_minutes', 60)
-                travel_after = place.get('travel_to_next_min', 0)
-                lunch_addition = 0
-                
-                # Check if we need lunch break
-                needs_lunch = not lunch_inserted and current_time >= LUNCH_BREAK_TIME * 60 - 30
-                if needs_lunch:
-                    lunch_addition = LUNCH_BREAK_DURATION
-                
-                # Calculate when we'd finish this place
-                finish_time = current_time + lunch_addition + time_at_place + travel_after
-                
-                # Check if this place exceeds end time
-                is_user_forced = place.get('id') in user_forced_ids
-                exceeds_end_time = finish_time > end_time_minutes
-                
-                if exceeds_end_time and not is_user_forced:
+            # Most trips force nothing, so skip the per-place id lookups then
+            if user_forced_ids:
+                forced = [place.get('id') in user_forced_ids for place in day['places']]
+            else:
+                forced = [False] * len(day['places'])
+            
+            slots, current_time = plan_day_times(
+                [place.get('avg_time_minutes', 60) for place in day['places']],
+                [place.get('travel_to_next_min', 0) for place in day['places']],
+                forced,
+                start_hour * 60,  # Convert to minutes from midnight
+                end_time_minutes
+            )
+            
+            for place, slot in zip(day['places'], slots):
+                if slot is None:
                     # Remove this place - it doesn't fit
                     overflow_places.append(place)
                     continue
                 
-                # Add lunch break if needed
-                if needs_lunch:
-                    place['has_lunch_before'] = True
-                    current_time += LUNCH_BREAK_DURATION
-                    lunch_inserted = True
-                else:
-                    place['has_lunch_before'] = False
-                
-                # Set scheduled arrival time
-                hours = int(current_time // 60)
-                minutes = int(current_time % 60)
-                place['scheduled_time'] = f"{hours:02d}:{minutes:02d}"
+                arrival, departure, lunch_before, runs_late = slot
+                place['has_lunch_before'] = lunch_before
                 
-                # Calculate departure time
-                departure_time = current_time + time_at_place
-                dep_hours = int(departure_time // 60)
-                dep_minutes = int(departure_time % 60)
-                place['departure_time'] = f"{dep_hours:02d}:{dep_minutes:02d}"
+                # Set scheduled arrival and departure times
+                place['scheduled_time'] = format_hhmm(arrival)
+                place['departure_time'] = format_hhmm(departure)
                 
                 # Add warning for user-forced places that exceed end time
-                if is_user_forced and exceeds_end_time:
+                if runs_late:
                     place['warning'] = 'late_schedule'
                     place['warning_message'] = f"This place causes schedule to extend past {end_hour}:00"
                 
-                # Move current time forward
-                current_time = departure_time + travel_after
-                
                 places_to_keep.append(place)
+                kept_drive += place.get('travel_to_next_min', 0)
             
             # Update day's places with only the kept ones
             day['places'] = places_to_keep
             day['place_count'] = len(places_to_keep)
-            day['total_drive_min'] = sum(p.get('travel_to_next_min', 0) for p in places_to_keep)
+            day['total_drive_min'] = kept_drive
             
             # Track removed/overflow places
             for p in overflow_places:
@@ -862,11 +1132,9 @@ class ItineraryScheduler:
                 })
             
             # Add end time of day
-            end_hours = int(current_time // 60)
-            end_minutes = int(current_time % 60)
-            day['end_time'] = f"{end_hours:02d}:{end_minutes:02d}"
-            day['start_time'] = f"{start_hour:02d}:00"
-            day['target_end_time'] = f"{end_hour:02d}:00"
+            day['end_time'] = format_hhmm(current_time)
+            day['start_time'] = day_start_text
+            day['target_end_time'] = day_end_text
         
         # Remove empty days
         days = [d for d in days if d['places']]
@@ -883,45 +1151,65 @@ class ItineraryScheduler:
             hotel_lng = hotel_location['lng']
             hotel_name = hotel_location.get('name', 'Hotel')
             
-            for day in days:
-                if not day['places']:
+            day_ends = [
+                (self._get_coordinates(day['places'][0]['id']), self._get_coordinates(day['places'][-1]['id']))
+                if day['places'] else None
+                for day in days
+            ]
+            
+            # Hotel legs (origin lat, lng, destination lat, lng) that need a travel time
+            legs = []
+            for ends in day_ends:
+                if not ends:
+                    continue
+                (first_lat, first_lng), (last_lat, last_lng) = ends
+                if first_lat and first_lng:
+                    legs.append((hotel_lat, hotel_lng, first_lat, first_lng))
+                if last_lat and last_lng:
+                    legs.append((last_lat, last_lng, hotel_lat, hotel_lng))
+            legs = list(dict.fromkeys(legs))
+            
+            leg_minutes = {}
+            if legs and not self.gmaps:
+                # Without the API every leg is a haversine estimate: do them all in one pass
+                # (hotel->place and place->hotel estimates are the same)
+                points = list(dict.fromkeys(
+                    leg[2:] if leg[:2] == (hotel_lat, hotel_lng) else leg[:2] for leg in legs
+                ))
+                minutes = self._estimate_travel_times(
+                    hotel_lat, hotel_lng, [pt[0] for pt in points], [pt[1] for pt in points]
+                )
+                by_point = dict(zip(points, minutes))
+                for leg in legs:
+                    point = leg[2:] if leg[:2] == (hotel_lat, hotel_lng) else leg[:2]
+                    leg_minutes[leg] = by_point[point]
+            elif legs:
+                # Up to two legs per day; reuse the route pool's cap rather than one thread per leg
+                with ThreadPoolExecutor(max_workers=min(MAX_ROUTE_WORKERS, len(legs))) as executor:
+                    leg_minutes = dict(zip(legs, executor.map(lambda leg: self._get_travel_time(*leg), legs)))
+            
+            for day, ends in zip(days, day_ends):
+                if not ends:
                     continue
                 
                 first_place = day['places'][0]
                 last_place = day['places'][-1]
-                
-                # Get first place coordinates
-                first_data = self.places_data.get(first_place['id'], {})
-                first_loc = first_data.get('location', {})
-                first_lat = first_loc.get('lat', 0)
-                first_lng = first_loc.get('lng', 0)
-                
-                # Get last place coordinates
-                last_data = self.places_data.get(last_place['id'], {})
-                last_loc = last_data.get('location', {})
-                last_lat = last_loc.get('lat', 0)
-                last_lng = last_loc.get('lng', 0)
+                (first_lat, first_lng), (last_lat, last_lng) = ends
                 
                 # Calculate travel times
                 if first_lat and first_lng:
-                    day['hotel_to_first_min'] = self._get_travel_time(
-                        hotel_lat, hotel_lng, first_lat, first_lng
-                    )
+                    day['hotel_to_first_min'] = leg_minutes[(hotel_lat, hotel_lng, first_lat, first_lng)]
                 else:
                     day['hotel_to_first_min'] = 15  # Default estimate
                 
                 if last_lat and last_lng:
-                    day['last_to_hotel_min'] = self._get_travel_time(
-                        last_lat, last_lng, hotel_lat, hotel_lng
-                    )
+                    day['last_to_hotel_min'] = leg_minutes[(last_lat, last_lng, hotel_lat, hotel_lng)]
                 else:
                     day['last_to_hotel_min'] = 15  # Default estimate
                 
                 # Adjust start time to include hotel departure
                 hotel_depart_min = start_hour * 60 - day['hotel_to_first_min']
-                dep_h = int(hotel_depart_min // 60)
-                dep_m = int(hotel_depart_min % 60)
-                day['hotel_departure_time'] = f"{dep_h:02d}:{dep_m:02d}"
+                day['hotel_departure_time'] = format_hhmm(hotel_depart_min)
                 day['hotel_name'] = hotel_name
                 
                 print(f"  🏨 Day {day['day']}: Hotel→{first_place['name']} {day['hotel_to_first_min']}min, {last_place['name']}→Hotel {day['last_to_hotel_min']}min")
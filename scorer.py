@@ -17,14 +17,26 @@ Features:
 
 import os
 import json
+import hashlib
+from collections import OrderedDict
 import numpy as np
-from typing import Dict, List, Any, Optional
-from scipy.spatial.distance import cosine
+from typing import Dict, List, Any, Optional, Tuple
 from google import genai
 from dotenv import load_dotenv
 
+from api_cache import CACHE_DIR
+
 load_dotenv()
 
+# Parsed embeddings are kept as <prefix>.<content hash>.npz under CACHE_DIR
+EMBEDDINGS_SIDECAR_PREFIX = "place_embeddings"
+
+# Ranks with a precomputed popularity score (larger ranks score 0 anyway)
+POPULARITY_LUT_SIZE = 1000
+
+# Distinct user queries whose unit embedding is kept in memory (LRU)
+QUERY_CACHE_SIZE = 512
+
 
 class ItineraryRanker:
     """
@@ -43,12 +55,22 @@ class ItineraryRanker:
         'low': ['Easy']
     }
 
+    # User Difficulty Level -> Place Difficulties they are comfortable with (no flag)
+    MOBILITY_COMFORT_MAP = {
+        'low': ('Easy',),
+        'medium': ('Easy', 'Moderate'),
+        'high': ('Easy', 'Moderate', 'Hard')
+    }
+
     EMBEDDING_MODEL = "gemini-embedding-001"
     
     def __init__(self, places_path: str = 'data/kodaikanal_places.json'):
         """Initialize the ranker by loading places and pre-computed embeddings."""
         self.places_path = places_path
         self.embeddings_path = 'data/place_embeddings.json'
+        # float32 matrix export written by sync_embeddings (row i = ids[i])
+        self.embeddings_npy_path = 'data/place_embeddings.npy'
+        self.embedding_ids_path = 'data/place_embedding_ids.json'
         
         # Configure Gemini client (for user query embedding only)
         api_key = (
@@ -62,9 +84,28 @@ class ItineraryRanker:
         
         # In-memory cache
         self.places: List[Dict] = []
-        self.embeddings: Dict[str, List[float]] = {}
+        self.embeddings: Dict[str, np.ndarray] = {}
         self.last_load_time: float = 0
         
+        # Unit-length embedding per place (row i = self.places[i]); rows of
+        # places without an embedding are zero and masked out by _has_embedding
+        self._unit_vectors: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+        self._has_embedding: np.ndarray = np.zeros(0, dtype=bool)
+        self._score_rows: np.ndarray = np.zeros(0, dtype=np.intp)
+        self._score_vectors: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+        self._score_has_embedding: np.ndarray = np.zeros(0, dtype=bool)
+        
+        # Popularity score per rank, and per place (refreshed on reload)
+        self._pop_lut = np.array(
+            [self._calculate_popularity_score(rank) for rank in range(POPULARITY_LUT_SIZE)],
+            dtype=np.float64
+        )
+        self._pop_ranks: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._pop_scores: np.ndarray = np.zeros(0)
+        
+        # Unit query embeddings keyed by normalized query text (most recent last)
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        
         # Pre-load on init
         self._check_and_reload()
         print("✅ ItineraryRanker V3 initialized (Gemini ETL Mode - Pure Reader)")
@@ -86,37 +127,197 @@ class ItineraryRanker:
                 with open(self.places_path, 'r') as f:
                     data = json.load(f)
                 
-                self.places = data.get('places', [])
+                places = data.get('places', [])
                 
-                if not self.places:
+                if not places:
+                    self.places = []
                     print("⚠️ No places found in JSON")
                     return False
                 
-                # Load pre-computed embeddings
-                if os.path.exists(self.embeddings_path):
-                    with open(self.embeddings_path, 'r') as f:
-                        self.embeddings = json.load(f)
-                    print(f"📦 Loaded {len(self.embeddings)} pre-computed embeddings")
+                # Everything derived from places is built into locals first and
+                # only published below, so a failure here keeps the previous
+                # reload intact (and the unchanged mtime makes the next call retry)
+                if os.path.exists(self.embeddings_path) or os.path.exists(self.embeddings_npy_path):
+                    embeddings = self._load_embeddings()
+                    print(f"📦 Loaded {len(embeddings)} pre-computed embeddings")
                 else:
-                    self.embeddings = {}
+                    embeddings = {}
                     print("⚠️ No embeddings cache found. Run: python scripts/sync_embeddings.py")
                 
+                unit_vectors, has_embedding = self._build_unit_vectors(places, embeddings)
+                pop_ranks = np.array(
+                    [p.get('stats', {}).get('popularity_rank', 50) for p in places],
+                    dtype=np.int64
+                )
+                pop_scores = self._pop_lut[np.clip(pop_ranks, 0, POPULARITY_LUT_SIZE - 1)]
+                columns = self._build_columns(places)
+                
+                # Rows score_places scores, with their unit vectors gathered once
+                score_rows = np.flatnonzero(columns['_include_mask'])
+                score_vectors = np.ascontiguousarray(unit_vectors[score_rows])
+                score_has_embedding = has_embedding[score_rows]
+                
+                # Publish the new state
+                self.__dict__.update(columns)
+                self.embeddings = embeddings
+                self._unit_vectors = unit_vectors
+                self._has_embedding = has_embedding
+                self._pop_ranks = pop_ranks
+                self._pop_scores = pop_scores
+                self._score_rows = score_rows
+                self._score_vectors = score_vectors
+                self._score_has_embedding = score_has_embedding
+                self.places = places
                 self.last_load_time = file_mtime
                 
                 # Report coverage
-                place_ids = {p.get('id') for p in self.places if p.get('id')}
-                cached_ids = set(self.embeddings.keys())
-                missing = place_ids - cached_ids
+                place_ids = {p.get('id') for p in places if p.get('id')}
+                missing = place_ids - set(embeddings.keys())
                 if missing:
                     print(f"  ⚠️ {len(missing)} places missing embeddings (will score as 0)")
                 
-                print(f"✅ Loaded {len(self.places)} places")
+                print(f"✅ Loaded {len(places)} places")
                 return True
                 
         except Exception as e:
             print(f"❌ Error loading places: {e}")
             return False
 
+    def _load_embeddings(self) -> Dict[str, np.ndarray]:
+        """
+        Load pre-computed embeddings as {place_id: vector}.
+        
+        Prefers the float32 .npy export from sync_embeddings (memory-mapped,
+        no parsing) when its recorded source hash matches the JSON. Otherwise
+        the JSON is parsed once and cached in a .npz sidecar keyed by that
+        hash, so restarts skip parsing ~N x 3072 floats out of JSON.
+        """
+        digest = None
+        if os.path.exists(self.embeddings_path):
+            with open(self.embeddings_path, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.blake2b(raw, digest_size=8).hexdigest()
+        
+        if os.path.exists(self.embeddings_npy_path) and os.path.exists(self.embedding_ids_path):
+            try:
+                with open(self.embedding_ids_path, 'r') as f:
+                    export = json.load(f)
+                ids = export['ids']
+                if digest is None or export.get('source') == digest:
+                    matrix = np.load(self.embeddings_npy_path, mmap_mode='r')
+                    if len(ids) == len(matrix):
+                        return dict(zip(ids, matrix))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"⚠️ Could not load embeddings matrix ({e}), using JSON")
+        
+        if digest is None:
+            return {}
+        
+        sidecar = CACHE_DIR / f"{EMBEDDINGS_SIDECAR_PREFIX}.{digest}.npz"
+        
+        if sidecar.exists():
+            try:
+                with np.load(sidecar) as cached:
+                    return dict(zip(cached['ids'].tolist(), cached['vectors']))
+            except (OSError, ValueError, KeyError):
+                pass  # Corrupt sidecar - rebuild it
+        
+        data = json.loads(raw)
+        ids = list(data)
+        try:
+            vectors = np.array([data[pid] for pid in ids], dtype=np.float64)
+        except ValueError:
+            # Mixed dimensions: can't stack, so skip the sidecar
+            return {pid: np.asarray(v, dtype=np.float64) for pid, v in data.items()}
+        
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = sidecar.with_name(f"{sidecar.stem}.{os.getpid()}.tmp.npz")
+            np.savez(tmp_path, ids=np.array(ids, dtype=str), vectors=vectors)
+            os.replace(tmp_path, sidecar)
+            
+            # Drop sidecars of older embeddings files
+            for stale in CACHE_DIR.glob(f"{EMBEDDINGS_SIDECAR_PREFIX}.*.npz"):
+                if stale != sidecar and '.tmp.' not in stale.name:
+                    stale.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"⚠️ Could not cache embeddings: {e}")
+        
+        return dict(zip(ids, vectors))
+    
+    def _build_unit_vectors(self, places: List[Dict], embeddings: Dict[str, np.ndarray]):
+        """Stack place embeddings (in places order) into one L2-normalized matrix."""
+        rows = [embeddings.get(p.get('id')) for p in places]
+        has_embedding = np.array([r is not None for r in rows], dtype=bool)
+        dim = len(next((r for r in rows if r is not None), ()))
+        
+        vectors = np.zeros((len(rows), dim))
+        for i, row in enumerate(rows):
+            if row is not None:
+                vectors[i] = row
+        
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        # float32 halves the matrix scanned per request; ranking is unaffected
+        unit = np.ascontiguousarray(vectors / np.where(norms > 0, norms, 1), dtype=np.float32)
+        return unit, has_embedding
+    
+    def _build_columns(self, places: List[Dict]) -> Dict[str, Any]:
+        """
+        Flatten the per-place fields score_places reads into parallel lists
+        (row i = places[i]), so scoring does no nested .get() walks.
+        
+        Returns:
+            {attribute name: column}, published onto the ranker by the caller
+        """
+        locations = [p.get('location', {}) for p in places]
+        contents = [p.get('content', {}) for p in places]
+        stats = [p.get('stats', {}) for p in places]
+        logics = [p.get('logic', {}) for p in places]
+        
+        difficulties = [logic.get('difficulty', 'Easy') for logic in logics]
+        clusters = [loc.get('cluster_zone', '') for loc in locations]
+        
+        return {
+            '_ids': [p.get('id') for p in places],
+            '_names': [p.get('name') for p in places],
+            '_clusters': clusters,
+            '_nearest_clusters': [loc.get('nearest_cluster') for loc in locations],
+            '_image_urls': [self._resolve_image_url(content) for content in contents],
+            '_tags': [content.get('tags', []) for content in contents],
+            '_ratings': [st.get('rating') for st in stats],
+            '_review_counts': [st.get('review_count', 0) for st in stats],
+            '_difficulties': difficulties,
+            '_avg_times': [logic.get('avg_time_spent_minutes', 60) for logic in logics],
+            '_include_mask': np.array(
+                [logic.get('itinerary_include') is not False for logic in logics],
+                dtype=bool
+            ),
+            # Soft-gate flags: per user difficulty level, places outside its comfort zone
+            '_effort_flag_by_level': {
+                level: np.array([d not in comfortable for d in difficulties], dtype=bool)
+                for level, comfortable in self.MOBILITY_COMFORT_MAP.items()
+            },
+            '_outskirts_mask': np.array([c == "Outskirts" for c in clusters], dtype=bool),
+        }
+    
+    def _resolve_image_url(self, content: Dict) -> str:
+        """Best image for a place: local file, then Google photo, then a usable hero URL."""
+        local_image = content.get('local_image')
+        if local_image:
+            return f"/api/images/{local_image.replace('images/', '')}"
+        
+        photo_ref = content.get('photo_reference')
+        if photo_ref:
+            return f"/api/photo/{photo_ref}"
+        
+        hero = content.get('hero_image_url')
+        if hero and hero.startswith('http') and any(
+            ext in hero.lower()
+            for ext in ['.jpg', '.jpeg', '.png', '.webp', 'googleusercontent', 'wikimedia']
+        ):
+            return self._clean_image_url(hero)
+        return ''
+    
     def _clean_image_url(self, url):
         """Clean Googleusercontent URLs to remove specific formatting params."""
         if not url:
@@ -153,14 +354,7 @@ class ItineraryRanker:
     def _check_mobility_flag(self, place: dict, user_difficulty: str) -> Optional[str]:
         """Check if place difficulty exceeds user's comfort level. Returns flag or None."""
         place_difficulty = place.get('logic', {}).get('difficulty', 'Easy')
-        
-        comfort_map = {
-            'low': ['Easy'],
-            'medium': ['Easy', 'Moderate'],
-            'high': ['Easy', 'Moderate', 'Hard']
-        }
-        
-        allowed = comfort_map.get(user_difficulty, ['Easy', 'Moderate', 'Hard'])
+        allowed = self.MOBILITY_COMFORT_MAP.get(user_difficulty, self.MOBILITY_COMFORT_MAP['high'])
         
         if place_difficulty not in allowed:
             return "High Physical Effort"
@@ -179,10 +373,51 @@ class ItineraryRanker:
             print(f"❌ Error embedding user query: {e}")
             return None
     
+    def _query_unit_vector(self, terms: List[str]) -> Optional[np.ndarray]:
+        """
+        L2-normalized embedding of a user query, reusing earlier requests.
+        
+        The cache key ignores case, whitespace and word order, so
+        "Nature Lakes" and "lakes nature" share one Gemini call. The query
+        text itself is only joined on a cache miss.
+        
+        Args:
+            terms: Interests followed by tags, in the user's order
+            
+        Returns:
+            Unit vector, or None if the query is empty or embedding failed
+        """
+        key = ' '.join(sorted(word.lower() for term in terms for word in term.split()))
+        if not key:
+            return None
+        
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            self._query_cache.move_to_end(key)
+            return cached
+        
+        user_vector = self._embed_user_query(' '.join(terms).strip())
+        if user_vector is None:
+            return None
+        
+        query_vec = np.asarray(user_vector, dtype=np.float64)
+        query_norm = np.linalg.norm(query_vec)
+        if query_norm > 0:
+            query_vec = query_vec / query_norm
+        query_vec = query_vec.astype(np.float32)
+        query_vec.setflags(write=False)
+        
+        self._query_cache[key] = query_vec
+        if len(self._query_cache) > QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        return query_vec
+    
     def score_places(
         self, 
         user_profile: Dict[str, Any], 
-        weight: Optional[Dict[str, float]] = None
+        weight: Optional[Dict[str, float]] = None,
+        views: Tuple[str, ...] = ('final',),
+        top_k: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Score ALL places with soft-gate filtering (flags, not deletions).
@@ -190,9 +425,13 @@ class ItineraryRanker:
         Args:
             user_profile: Contains interests (list or str), difficulty (str)
             weight: Optional dict with 'popularity' and 'similarity' weights (default 0.5/0.5)
+            views: Sorted views to build: any of 'final', 'popularity', 'similarity'
+            top_k: Keep only the best k places of each view (None = all); result
+                dicts are only built for places that make it into a view
             
         Returns:
-            Dict with 'places' (all scored), 'by_popularity', 'by_similarity' lists
+            Dict with 'places' (all scored), 'by_popularity', 'by_similarity' lists;
+            views not requested are returned empty
         """
         # Ensure data is fresh
         self._check_and_reload()
@@ -211,97 +450,93 @@ class ItineraryRanker:
         pop_weight = weight.get('popularity', 0.5)
         sim_weight = weight.get('similarity', 0.5)
         
-        # Build user query and embed it
-        if isinstance(interests, list):
-            interest_text = ' '.join(interests)
-        else:
-            interest_text = str(interests)
+        # Build user query terms and embed them (empty -> no API call)
+        tags = user_profile.get('tags', '')
+        terms = [
+            term
+            for value in (interests, tags)
+            for term in (value if isinstance(value, list) else [str(value)])
+            if term
+        ]
+        query_vec = self._query_unit_vector(terms)
         
-        tags_text = user_profile.get('tags', '')
-        if isinstance(tags_text, list):
-            tags_text = ' '.join(tags_text)
-            
-        query = f"{interest_text} {tags_text}".strip()
+        # ========== SCORE ALL PLACES (NO FILTERING) ==========
+        # Only rows not marked as excluded from itinerary
+        rows = self._score_rows
         
-        if query:
-            user_vector = self._embed_user_query(query)
+        # === SIMILARITY SCORE (0-100) ===
+        # Cosine similarity to every place in one matrix-vector product
+        if query_vec is not None and self._score_has_embedding.any():
+            cos_sims = (self._score_vectors @ query_vec).astype(np.float64)
+            sim_scores = np.where(self._score_has_embedding, ((cos_sims + 1) / 2) * 100, 0.0)  # Map [-1,1] -> [0,100]
+        elif query_vec is not None:
+            sim_scores = np.zeros(len(rows))
         else:
-            user_vector = None
+            sim_scores = np.full(len(rows), 50.0)  # Neutral if no interests
         
-        # ========== SCORE ALL PLACES (NO FILTERING) ==========
-        scored_places = []
+        # === POPULARITY SCORE (0-100) ===
+        pop_scores = self._pop_scores[rows]
         
-        for idx, place in enumerate(self.places):
-            # Skip places marked as excluded from itinerary
-            if place.get('logic', {}).get('itinerary_include') is False:
-                continue
-            
-            place_id = place.get('id')
-            
-            # === SIMILARITY SCORE (0-100) ===
-            if user_vector is not None and place_id and place_id in self.embeddings:
-                place_vector = self.embeddings[place_id]
-                cos_sim = 1 - cosine(user_vector, place_vector)
-                sim_score = ((cos_sim + 1) / 2) * 100  # Map [-1,1] -> [0,100]
-            elif user_vector is not None:
-                sim_score = 0.0
-            else:
-                sim_score = 50.0  # Neutral if no interests
-            
-            # === POPULARITY SCORE (0-100) ===
-            pop_rank = place.get('stats', {}).get('popularity_rank', 50)
-            pop_score = self._calculate_popularity_score(pop_rank)
-            
-            # === FINAL SCORE (weighted) ===
-            final_score = (sim_score * sim_weight) + (pop_score * pop_weight)
+        # === FINAL SCORE (weighted) ===
+        final_scores = (sim_scores * sim_weight) + (pop_scores * pop_weight)
+        
+        # Rounded once for all places; these are both the output values and sort keys
+        pop_keys = np.round(pop_scores, 2)
+        sim_keys = np.round(sim_scores, 2)
+        final_keys = np.round(final_scores, 2)
+        
+        # === SOFT-GATE FLAGS === (places outside this user's comfort zone, outskirts)
+        effort_flags = self._effort_flag_by_level.get(difficulty, self._effort_flag_by_level['high'])[rows]
+        outskirts_flags = self._outskirts_mask[rows]
+        
+        # Output dicts are built lazily, once per place, and shared between views
+        built: Dict[int, Dict] = {}
+        
+        def scored_place(pos: int) -> Dict:
+            place = built.get(pos)
+            if place is not None:
+                return place
             
-            # === SOFT-GATE FLAGS ===
+            idx = int(rows[pos])
             flags = []
-            mobility_flag = self._check_mobility_flag(place, difficulty)
-            if mobility_flag:
-                flags.append(mobility_flag)
-                
-            if place.get('location', {}).get('cluster_zone') == "Outskirts":
+            if effort_flags[pos]:
+                flags.append("High Physical Effort")
+            if outskirts_flags[pos]:
                 flags.append("Located in Outskirts")
             
-            scored_places.append({
-                'id': place.get('id'),
-                'name': place.get('name'),
-                'cluster': place.get('location', {}).get('cluster_zone', ''),
-                'nearest_cluster': place.get('location', {}).get('nearest_cluster'),
-                'image_url': (
-                    f"/api/images/{place.get('content', {}).get('local_image', '').replace('images/', '')}"
-                    if place.get('content', {}).get('local_image')
-                    else f"/api/photo/{place.get('content', {}).get('photo_reference')}"
-                    if place.get('content', {}).get('photo_reference')
-                    else self._clean_image_url(place.get('content', {}).get('hero_image_url'))
-                    if place.get('content', {}).get('hero_image_url') and 
-                       place.get('content', {}).get('hero_image_url', '').startswith('http') and
-                       any(ext in place.get('content', {}).get('hero_image_url', '').lower() for ext in ['.jpg', '.jpeg', '.png', '.webp', 'googleusercontent', 'wikimedia'])
-                    else ''
-                ),
-                'tags': place.get('content', {}).get('tags', []),
-                'rating': place.get('stats', {}).get('rating'),
-                'review_count': place.get('stats', {}).get('review_count', 0),
-                'difficulty': place.get('logic', {}).get('difficulty', 'Easy'),
-                'avg_time_minutes': place.get('logic', {}).get('avg_time_spent_minutes', 60),
+            place = built[pos] = {
+                'id': self._ids[idx],
+                'name': self._names[idx],
+                'cluster': self._clusters[idx],
+                'nearest_cluster': self._nearest_clusters[idx],
+                'image_url': self._image_urls[idx],
+                'tags': self._tags[idx],
+                'rating': self._ratings[idx],
+                'review_count': self._review_counts[idx],
+                'difficulty': self._difficulties[idx],
+                'avg_time_minutes': self._avg_times[idx],
                 'scores': {
-                    'pop': float(round(pop_score, 2)),
-                    'sim': float(round(sim_score, 2))
+                    'pop': float(pop_keys[pos]),
+                    'sim': float(sim_keys[pos])
                 },
-                'final_score': float(round(final_score, 2)),
-                'popularity_rank': int(pop_rank),
+                'final_score': float(final_keys[pos]),
+                'popularity_rank': int(self._pop_ranks[idx]),
                 'flags': flags,
-                'place_data': place
-            })
+                '_idx': idx  # Row in self.places (raw record)
+            }
+            return place
+        
+        # Create sorted views (stable descending: ties keep places-file order)
+        def sorted_view(keys: np.ndarray) -> List[Dict]:
+            order = np.argsort(-keys, kind='stable')[:top_k]
+            return [scored_place(pos) for pos in order.tolist()]
         
-        # Create sorted views
-        by_popularity = sorted(scored_places, key=lambda x: x['scores']['pop'], reverse=True)
-        by_similarity = sorted(scored_places, key=lambda x: x['scores']['sim'], reverse=True)
-        by_final = sorted(scored_places, key=lambda x: x['final_score'], reverse=True)
+        by_popularity = sorted_view(pop_keys) if 'popularity' in views else []
+        by_similarity = sorted_view(sim_keys) if 'similarity' in views else []
+        by_final = sorted_view(final_keys) if 'final' in views else []
         
-        print(f"📊 Scored {len(scored_places)} places (Gemini ETL mode)")
-        flagged_count = sum(1 for p in scored_places if p['flags'])
+        print(f"📊 Scored {len(rows)} places (Gemini ETL mode)")
+        flagged_count = int(np.count_nonzero(effort_flags | outskirts_flags))
         if flagged_count:
             print(f"  ⚠️ {flagged_count} places flagged with warnings")
         
@@ -323,7 +558,7 @@ class ItineraryRanker:
         result = self.score_places(user_profile)
         return [
             {
-                'place_data': p['place_data'],
+                'place_data': self.places[p['_idx']],
                 'debug': {
                     'sim_score': p['scores']['sim'],
                     'pop_score': p['scores']['pop'],
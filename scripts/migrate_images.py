@@ -9,7 +9,9 @@ Usage: python3 scripts/migrate_images.py
 import json
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -18,29 +20,35 @@ SCRIPT_DIR = Path(__file__).parent
 PROJECT_DIR = SCRIPT_DIR.parent
 PLACES_FILE = PROJECT_DIR / 'data' / 'kodaikanal_places.json'
 IMAGES_DIR = PROJECT_DIR / 'data' / 'images'
+DOWNLOAD_WORKERS = 16
 
 
-def download_image(place_slug: str, photo_reference: str, api_key: str) -> str | None:
-    """Download image from Google Maps and save locally."""
-    image_path = IMAGES_DIR / f"{place_slug}.jpg"
+def make_session() -> requests.Session:
+    """Session with a connection pool sized for all download workers (keep-alive reuse)."""
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=DOWNLOAD_WORKERS, pool_maxsize=DOWNLOAD_WORKERS))
+    return session
 
-    # Skip if already downloaded
-    if image_path.exists() and image_path.stat().st_size > 0:
-        return f"images/{place_slug}.jpg"
 
+def download_image(session: requests.Session, place_slug: str, photo_reference: str, api_key: str) -> tuple[str | None, Exception | None]:
+    """Download image from Google Maps and save locally; returns (local_path, error)."""
+    image_path = IMAGES_DIR / f"{place_slug}.jpg"
     url = f"https://maps.googleapis.com/maps/api/place/photo?maxwidth=800&photo_reference={photo_reference}&key={api_key}"
 
     try:
-        resp = requests.get(url, timeout=15)
+        # Skip if already downloaded
+        if image_path.exists() and image_path.stat().st_size > 0:
+            return f"images/{place_slug}.jpg", None
+
+        resp = session.get(url, timeout=15)
         if resp.status_code == 200 and 'image' in resp.headers.get('Content-Type', ''):
             with open(image_path, 'wb') as f:
                 f.write(resp.content)
-            return f"images/{place_slug}.jpg"
+            return f"images/{place_slug}.jpg", None
         else:
-            return None
+            return None, None
     except Exception as e:
-        print(f"    Error: {e}")
-        return None
+        return None, e
 
 
 def main():
@@ -61,6 +69,7 @@ def main():
 
     print(f"📸 Downloading images for {len(places)} places...\n")
 
+    to_download = []
     for place in places:
         name = place.get('name', '?')
         slug = place.get('id', '')
@@ -79,12 +88,28 @@ def main():
             skipped += 1
             continue
 
-        local_path = download_image(slug, photo_ref, api_key)
+        to_download.append(place)
+
+    # One worker per pooled connection (make_session sizes the pool to DOWNLOAD_WORKERS).
+    # download_image returns its error instead of raising, so the JSON below is always saved.
+    session = make_session()
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        results = list(executor.map(
+            lambda p: download_image(session, p['id'], p['content']['photo_reference'], api_key),
+            to_download
+        ))
+
+    for place, (local_path, error) in zip(to_download, results):
+        name = place.get('name', '?')
         if local_path:
             place.setdefault('content', {})['local_image'] = local_path
             downloaded += 1
-            size_kb = (IMAGES_DIR / f"{slug}.jpg").stat().st_size // 1024
+            image_path = PROJECT_DIR / 'data' / local_path
+            size_kb = image_path.stat().st_size // 1024 if image_path.exists() else 0
             print(f"  ✅ {name}: saved ({size_kb}KB)")
+        elif error is not None:
+            print(f"  ❌ {name}: error - {error}")
+            failed += 1
         else:
             print(f"  ❌ {name}: download failed")
             failed += 1
@@ -6,12 +6,25 @@ Uses each place's google_place_id to fetch a fresh photo_reference from Google M
 
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
 import googlemaps
 from dotenv import load_dotenv
 
 load_dotenv()
 
 PLACES_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'kodaikanal_places.json')
+LOOKUP_WORKERS = 8
+
+
+def fetch_photos(gmaps, place_id):
+    """Fetch a place's photos list; returns (photos, error)."""
+    try:
+        details = gmaps.place(place_id=place_id, fields=['photo'])
+        return details.get('result', {}).get('photos', []), None
+    except Exception as e:
+        return None, e
+
 
 def main():
     api_key = os.getenv('GOOGLE_MAPS_API_KEY')
@@ -28,37 +41,39 @@ def main():
     updated = 0
     failed = 0
 
+    to_lookup = []
     for place in places:
+        if not place.get('google_place_id'):
+            print(f"  ⏭️  {place.get('name', '?')}: no google_place_id, skipping")
+            continue
+        to_lookup.append(place)
+
+    # 8 workers stay under requests' default 10-connection pool in the googlemaps client
+    with ThreadPoolExecutor(max_workers=LOOKUP_WORKERS) as executor:
+        lookups = list(executor.map(lambda p: fetch_photos(gmaps, p['google_place_id']), to_lookup))
+
+    for place, (photos, error) in zip(to_lookup, lookups):
         name = place.get('name', '?')
-        place_id = place.get('google_place_id')
 
-        if not place_id:
-            print(f"  ⏭️  {name}: no google_place_id, skipping")
+        if error is not None:
+            print(f"  ❌ {name}: error - {error}")
+            failed += 1
             continue
 
-        try:
-            details = gmaps.place(place_id=place_id, fields=['photo'])
-            result = details.get('result', {})
-            photos = result.get('photos', [])
-
-            if photos:
-                new_ref = photos[0].get('photo_reference')
-                old_ref = place.get('content', {}).get('photo_reference')
-
-                if new_ref and new_ref != old_ref:
-                    place.setdefault('content', {})['photo_reference'] = new_ref
-                    updated += 1
-                    print(f"  ✅ {name}: photo_reference refreshed")
-                elif new_ref:
-                    print(f"  ✔️  {name}: photo_reference unchanged")
-                else:
-                    print(f"  ⚠️  {name}: no photo_reference in response")
-            else:
-                print(f"  ⚠️  {name}: no photos available")
+        if photos:
+            new_ref = photos[0].get('photo_reference')
+            old_ref = place.get('content', {}).get('photo_reference')
 
-        except Exception as e:
-            print(f"  ❌ {name}: error - {e}")
-            failed += 1
+            if new_ref and new_ref != old_ref:
+                place.setdefault('content', {})['photo_reference'] = new_ref
+                updated += 1
+                print(f"  ✅ {name}: photo_reference refreshed")
+            elif new_ref:
+                print(f"  ✔️  {name}: photo_reference unchanged")
+            else:
+                print(f"  ⚠️  {name}: no photo_reference in response")
+        else:
+            print(f"  ⚠️  {name}: no photos available")
 
     # Save updated data
     with open(PLACES_FILE, 'w', encoding='utf-8') as f:
@@ -2,9 +2,12 @@
 Sync Embeddings - Offline Builder Script
 ==========================================
 Generates Gemini embeddings for all places in kodaikanal_places.json
-and caches them to data/place_embeddings.json.
+and caches them to data/place_embeddings.json, plus a float32 matrix copy
+(data/place_embeddings.npy + data/place_embedding_ids.json) that the scorer
+loads without parsing JSON.
 
-Only processes NEW places not already in the cache (diff check).
+Only processes places that are NEW or whose embedded text (name, summary,
+tags) changed since the last sync (per-place text hash diff check).
 
 Usage:
     python scripts/sync_embeddings.py             # Generate missing embeddings
@@ -15,20 +18,34 @@ Usage:
 import os
 import sys
 import json
-import time
+import hashlib
 import argparse
 from dotenv import load_dotenv
 
+import numpy as np
+
 # Ensure project root is on path
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 
 from google import genai
 
+from fetch_place_data import retry_with_backoff
+
 # --- Configuration ---
 PLACES_PATH = os.path.join(PROJECT_ROOT, 'data', 'kodaikanal_places.json')
 EMBEDDINGS_PATH = os.path.join(PROJECT_ROOT, 'data', 'place_embeddings.json')
+# Same vectors as one (N, D) float32 matrix; row i belongs to ids[i], and the
+# ids file records the hash of the JSON cache it was exported from
+EMBEDDINGS_NPY_PATH = os.path.join(PROJECT_ROOT, 'data', 'place_embeddings.npy')
+EMBEDDING_IDS_PATH = os.path.join(PROJECT_ROOT, 'data', 'place_embedding_ids.json')
+# {place_id: hash of the text that was embedded}, to spot edited places
+HASHES_PATH = os.path.join(PROJECT_ROOT, 'data', 'place_embeddings.hashes.json')
+# Append-only log of embeddings generated since the last save (crash recovery)
+JOURNAL_PATH = os.path.join(PROJECT_ROOT, 'data', 'place_embeddings.journal.jsonl')
 EMBEDDING_MODEL = "gemini-embedding-001"
+# Documents per embed_content request (one HTTP round trip per batch)
+EMBED_BATCH_SIZE = 100
 
 
 def load_places():
@@ -50,6 +67,143 @@ def load_cache():
     return {}
 
 
+def cache_digest():
+    """Hash of the JSON cache bytes (the matrix export records which JSON it mirrors)."""
+    if not os.path.exists(EMBEDDINGS_PATH):
+        return None
+    with open(EMBEDDINGS_PATH, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+
+
+def save_matrix(cache):
+    """Write the cache as a float32 matrix + row ids (skipped if dimensions differ)."""
+    ids = list(cache)
+    try:
+        matrix = np.asarray([cache[pid] for pid in ids], dtype=np.float32)
+    except ValueError:
+        print("  ⚠️ Mixed embedding sizes - skipping matrix export")
+        return
+    
+    tmp_path = EMBEDDINGS_NPY_PATH + '.tmp.npy'
+    np.save(tmp_path, matrix)
+    os.replace(tmp_path, EMBEDDINGS_NPY_PATH)
+    with open(EMBEDDING_IDS_PATH, 'w') as f:
+        json.dump({'source': cache_digest(), 'ids': ids}, f)
+
+
+def matrix_is_current():
+    """True if the float32 matrix export mirrors the current JSON cache."""
+    if not (os.path.exists(EMBEDDINGS_NPY_PATH) and os.path.exists(EMBEDDING_IDS_PATH)):
+        return False
+    with open(EMBEDDING_IDS_PATH, 'r') as f:
+        return json.load(f).get('source') == cache_digest()
+
+
+def write_json_atomic(path, obj):
+    """Write JSON to a temp file and rename it over path (no half-written files)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(obj, f)
+    os.replace(tmp_path, path)
+
+
+def replay_journal(cache, hashes):
+    """
+    Apply embeddings journaled by an interrupted run to cache/hashes.
+    
+    Returns:
+        Number of recovered embeddings (a torn last line is ignored)
+    """
+    if not os.path.exists(JOURNAL_PATH):
+        return 0
+    
+    recovered = 0
+    with open(JOURNAL_PATH, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            cache[entry['id']] = entry['vec']
+            hashes[entry['id']] = entry['hash']
+            recovered += 1
+    return recovered
+
+
+def save_cache(cache, hashes):
+    """Persist cache + hashes, refresh the matrix export, and clear the journal."""
+    write_json_atomic(EMBEDDINGS_PATH, cache)
+    write_json_atomic(HASHES_PATH, hashes)
+    save_matrix(cache)
+    if os.path.exists(JOURNAL_PATH):
+        os.remove(JOURNAL_PATH)
+
+
+def load_hashes():
+    """Load the per-place text hashes of the current embeddings."""
+    if os.path.exists(HASHES_PATH):
+        with open(HASHES_PATH, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def embedding_text(place):
+    """Build the document text embedded for a place."""
+    name = place.get('name', 'Unknown')
+    content = place.get('content', {})
+    description = content.get('short_summary', '')
+    tags = ', '.join(content.get('tags', []))
+    return f"{name} - {description} Tags: {tags}"
+
+
+def text_digest(text):
+    """Short stable hash of an embedding text."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def find_outdated(places, cache, hashes):
+    """
+    Split places into ones needing an embedding and ones already up to date.
+    
+    Cached places without a recorded hash (synced before hashes existed) are
+    trusted and their current hash is recorded in `hashes`.
+    
+    Returns:
+        (outdated, up_to_date_count) where outdated is a list of
+        (place, text, digest, is_changed) tuples
+    """
+    outdated = []
+    up_to_date = 0
+    for place in places:
+        place_id = place.get('id')
+        if not place_id:
+            print(f"  ⚠️ Skipping place with no ID: {place.get('name', 'Unknown')}")
+            continue
+        
+        text = embedding_text(place)
+        digest = text_digest(text)
+        if place_id in cache:
+            if hashes.setdefault(place_id, digest) == digest:
+                up_to_date += 1
+                continue
+            outdated.append((place, text, digest, True))
+        else:
+            outdated.append((place, text, digest, False))
+    
+    return outdated, up_to_date
+
+
+@retry_with_backoff()
+def embed_batch(client, texts):
+    """Embed a batch of document texts in one request (429/5xx are retried with backoff)."""
+    result = client.models.embed_content(
+        model=EMBEDDING_MODEL,
+        contents=texts,
+        config={"task_type": "RETRIEVAL_DOCUMENT"}
+    )
+    return [embedding.values for embedding in result.embeddings]
+
+
 def get_api_key():
     """Get Gemini API key from environment, trying multiple names."""
     load_dotenv(os.path.join(PROJECT_ROOT, '.env'))
@@ -71,12 +225,19 @@ def show_status():
     """Show current cache status."""
     places = load_places()
     cache = load_cache()
+    hashes = load_hashes()
     
-    place_ids = {p.get('id') for p in places if p.get('id')}
+    names_by_id = {p['id']: p.get('name', p['id']) for p in places if p.get('id')}
+    place_ids = set(names_by_id)
     cached_ids = set(cache.keys())
     
     missing = place_ids - cached_ids
     stale = cached_ids - place_ids
+    changed = {
+        p['id'] for p in places
+        if p.get('id') in cached_ids and p['id'] in hashes
+        and hashes[p['id']] != text_digest(embedding_text(p))
+    }
     
     print(f"\n📊 Embedding Cache Status")
     print(f"{'='*50}")
@@ -87,11 +248,15 @@ def show_status():
     if missing:
         print(f"  ⚠️  Missing:             {len(missing)}")
         for pid in sorted(missing):
-            name = next((p['name'] for p in places if p.get('id') == pid), pid)
-            print(f"      - {name}")
+            print(f"      - {names_by_id[pid]}")
     else:
         print(f"  ✅ All places have embeddings!")
     
+    if changed:
+        print(f"  ✏️  Text changed:        {len(changed)}")
+        for pid in sorted(changed):
+            print(f"      - {names_by_id[pid]}")
+    
     if stale:
         print(f"  🗑️  Stale (not in master): {len(stale)}")
     
@@ -129,78 +294,69 @@ def main():
     # 2. Load Source & Target
     places = load_places()
     cache = load_cache()
+    hashes = load_hashes()
+    recovered = replay_journal(cache, hashes)
     
     print(f"📍 Loaded {len(places)} places from {os.path.basename(PLACES_PATH)}")
     print(f"📦 Existing cache: {len(cache)} embeddings")
+    if recovered:
+        print(f"♻️  Recovered {recovered} embeddings from an interrupted run")
 
     # 3. Diff Check & Generate
     new_count = 0
-    skip_count = 0
     error_count = 0
     
-    new_places = []
-    for place in places:
-        place_id = place.get('id')
-        name = place.get('name', 'Unknown')
-        
-        if not place_id:
-            print(f"  ⚠️ Skipping place with no ID: {name}")
-            continue
-        
-        if place_id in cache:
-            skip_count += 1
-            continue
-        
-        new_places.append(place)
+    new_places, skip_count = find_outdated(places, cache, hashes)
+    changed_count = sum(1 for *_, is_changed in new_places if is_changed)
     
     if not new_places:
         print(f"\n✅ All {skip_count} places already have embeddings. Nothing to do.")
+        if not args.dry_run and recovered:
+            save_cache(cache, hashes)
+        elif not args.dry_run:
+            write_json_atomic(HASHES_PATH, hashes)
+            if cache and not matrix_is_current():
+                save_matrix(cache)
+                print(f"📦 Exported matrix: {EMBEDDINGS_NPY_PATH}")
         show_status()
         return
     
     print(f"\n{'='*50}")
-    print(f"  {len(new_places)} new places need embeddings")
+    print(f"  {len(new_places) - changed_count} new places need embeddings")
+    print(f"  {changed_count} places changed since last sync")
     print(f"  {skip_count} places already cached")
     print(f"{'='*50}")
     
     if args.dry_run:
         print(f"\n🏃 DRY RUN - would generate embeddings for:")
-        for p in new_places:
-            print(f"  [ ] {p.get('name', 'Unknown')}")
+        for p, _, _, is_changed in new_places:
+            print(f"  [{'~' if is_changed else ' '}] {p.get('name', 'Unknown')}")
         print(f"\nRun without --dry-run to generate.")
         return
 
-    # Generate embeddings
-    for place in new_places:
-        place_id = place.get('id')
-        name = place.get('name', 'Unknown')
-        
-        content = place.get('content', {})
-        description = content.get('short_summary', '')
-        tags = ', '.join(content.get('tags', []))
-        text = f"{name} - {description} Tags: {tags}"
-
-        try:
-            result = client.models.embed_content(
-                model=EMBEDDING_MODEL,
-                contents=text,
-                config={"task_type": "RETRIEVAL_DOCUMENT"}
-            )
-            
-            cache[place_id] = result.embeddings[0].values
-            new_count += 1
-            print(f"  [+] Generated embedding for: {name}")
-            
-            time.sleep(1)
-            
-        except Exception as e:
-            error_count += 1
-            print(f"  ❌ Error embedding {name}: {e}")
-            continue
+    # Generate embeddings in batches (no fixed sleep; rate limits back off and retry).
+    # Each batch is journaled as soon as it arrives, so a crash loses at most one batch.
+    with open(JOURNAL_PATH, 'a') as journal:
+        for start in range(0, len(new_places), EMBED_BATCH_SIZE):
+            batch = new_places[start:start + EMBED_BATCH_SIZE]
+
+            try:
+                vectors = embed_batch(client, [text for _, text, _, _ in batch])
+            except Exception as e:
+                error_count += len(batch)
+                print(f"  ❌ Error embedding batch of {len(batch)} places: {e}")
+                continue
+
+            for (place, _, digest, _), vector in zip(batch, vectors):
+                cache[place['id']] = vector
+                hashes[place['id']] = digest
+                journal.write(json.dumps({'id': place['id'], 'hash': digest, 'vec': vector}) + '\n')
+                new_count += 1
+                print(f"  [+] Generated embedding for: {place.get('name', 'Unknown')}")
+            journal.flush()
 
     # 4. Save
-    with open(EMBEDDINGS_PATH, 'w') as f:
-        json.dump(cache, f)
+    save_cache(cache, hashes)
     
     # 5. Summary
     print(f"\n{'='*50}")
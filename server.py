@@ -564,7 +564,13 @@ def fetch_scored_places():
         
         # Get scorer
         scorer = get_ranker()
-        result = scorer.score_places(user_profile, weight)
+        result = scorer.score_places(
+            user_profile, weight, views=('final', 'popularity', 'similarity')
+        )
+        
+        # The explorer's detail modal reads fields from the raw place record
+        for place in result['places']:
+            place['place_data'] = scorer.places[place.pop('_idx')]
         
         return jsonify({
             "success": True,